@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.cases import CASES
+from benchmarks.runner import compare, load_results, run_benchmarks, save_results
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmark the conversion engines.")
+    parser.add_argument("cases", nargs="*", default=["*"], help="case names or glob patterns")
+    parser.add_argument("--list", action="store_true", help="list available cases and exit")
+    parser.add_argument("--corpus-dir", type=Path, default=Path(tempfile.gettempdir()) / "konvertchi-bench")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplier for corpus sizes")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", type=Path, help="write results as JSON")
+    parser.add_argument("--baseline", type=Path, help="compare against a saved results file")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown before failing")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    if args.list:
+        print("\n".join(CASES))
+        return 0
+
+    names = [name for name in CASES if any(fnmatch.fnmatch(name, pattern) for pattern in args.cases)]
+    if not names:
+        print("No benchmark cases match", " ".join(args.cases), file=sys.stderr)
+        return 2
+
+    results = run_benchmarks(names, args.corpus_dir, args.scale, args.repeat)
+    if args.output:
+        save_results(results, args.output)
+    if args.baseline:
+        regressions = compare(results, load_results(args.baseline), args.threshold)
+        for line in regressions:
+            print("REGRESSION", line, file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Tuple
+
+from benchmarks import corpus
+from bot.models.documents import TextAlignment, TextStyle
+from bot.utils.files import create_temp_file
+
+Runner = Callable[[], object]
+
+
+@dataclass(frozen=True)
+class Case:
+    name: str
+    unit: str
+    setup: Callable[[Path, float], Tuple[Runner, float]]
+
+
+def _scaled(value: int, scale: float) -> int:
+    return max(1, int(value * scale))
+
+
+def _text_to_pdf(directory: Path, scale: float) -> Tuple[Runner, float]:
+    from bot.engines.text_engine import text_to_pdf
+
+    body = corpus.text_body(_scaled(200_000, scale))
+    return lambda: text_to_pdf("Benchmark", body, TextAlignment.JUSTIFY, TextStyle.NORMAL, 12), len(body)
+
+
+def _text_to_docx(directory: Path, scale: float) -> Tuple[Runner, float]:
+    from bot.engines.text_engine import text_to_docx
+
+    body = corpus.text_body(_scaled(200_000, scale))
+    return lambda: text_to_docx("Benchmark", body, TextAlignment.JUSTIFY, TextStyle.NORMAL, 12), len(body)
+
+
+def _images_to_pdf(directory: Path, scale: float) -> Tuple[Runner, float]:
+    from bot.engines.image_engine import images_to_pdf
+
+    paths = corpus.jpeg_album(directory, _scaled(10, scale), 4000, 3000)
+    return lambda: images_to_pdf(paths, title="Album"), len(paths)
+
+
+def _image_to_passport(directory: Path, scale: float) -> Tuple[Runner, float]:
+    from bot.engines.image_engine import image_to_passport
+
+    path = corpus.jpeg_album(directory, 1, 4000, 3000)[0]
+    return lambda: image_to_passport(path, as_pdf=True), 1
+
+
+def _passport_batch(directory: Path, scale: float) -> Tuple[Runner, float]:
+    from bot.engines.image_engine import passport_batch
+
+    paths = corpus.jpeg_album(directory, _scaled(10, scale), 4000, 3000)
+    return lambda: passport_batch(paths), len(paths)
+
+
+def _inspect_pdf(directory: Path, scale: float) -> Tuple[Runner, float]:
+    from bot.engines.pdf_engine import inspect_pdf
+
+    path = corpus.pdf_document(directory, _scaled(500, scale))
+    return lambda: inspect_pdf(path), 1
+
+
+def _merge_pdfs(directory: Path, scale: float) -> Tuple[Runner, float]:
+    from bot.engines.pdf_engine import merge_pdfs
+
+    pages = _scaled(500, scale)
+    path = corpus.pdf_document(directory, pages)
+
+    def run() -> None:
+        output = create_temp_file(".pdf")
+        try:
+            merge_pdfs([path] * 4, output.path)
+        finally:
+            output.cleanup()
+
+    return run, pages * 4
+
+
+def _pdf_to_docx(directory: Path, scale: float) -> Tuple[Runner, float]:
+    from bot.engines.pdf_engine import pdf_to_docx
+
+    pages = _scaled(500, scale)
+    path = corpus.pdf_document(directory, pages)
+    return lambda: pdf_to_docx(path), pages
+
+
+def _compress_pdf(directory: Path, scale: float) -> Tuple[Runner, float]:
+    from bot.engines.pdf_engine import compress_pdf
+
+    pages = _scaled(20, scale)
+    path = corpus.scanned_pdf(directory, pages)
+
+    def run() -> None:
+        output = create_temp_file(".pdf")
+        try:
+            compress_pdf(path, output.path)
+        finally:
+            output.cleanup()
+
+    return run, pages
+
+
+def _docx_to_pdf(directory: Path, scale: float) -> Tuple[Runner, float]:
+    from bot.engines.docx_engine import docx_to_pdf
+
+    paragraphs = _scaled(5000, scale)
+    path = corpus.docx_document(directory, paragraphs)
+    return lambda: docx_to_pdf(path, title="Benchmark"), paragraphs
+
+
+CASES: Dict[str, Case] = {
+    case.name: case
+    for case in (
+        Case("text_engine.text_to_pdf", "chars", _text_to_pdf),
+        Case("text_engine.text_to_docx", "chars", _text_to_docx),
+        Case("image_engine.images_to_pdf", "images", _images_to_pdf),
+        Case("image_engine.image_to_passport", "images", _image_to_passport),
+        Case("image_engine.passport_batch", "images", _passport_batch),
+        Case("pdf_engine.inspect_pdf", "documents", _inspect_pdf),
+        Case("pdf_engine.merge_pdfs", "pages", _merge_pdfs),
+        Case("pdf_engine.pdf_to_docx", "pages", _pdf_to_docx),
+        Case("pdf_engine.compress_pdf", "pages", _compress_pdf),
+        Case("docx_engine.docx_to_pdf", "paragraphs", _docx_to_pdf),
+    )
+}
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import random
+from pathlib import Path
+from typing import List
+
+from docx import Document
+from PIL import Image
+from reportlab import rl_config
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+SEED = 1337
+
+# Scanners write raw DCT streams; ReportLab's ASCII85 default would make image
+# decoding, not the code under test, dominate PDF benchmarks.
+rl_config.useA85 = 0
+WORDS = (
+    "hujjat fayl sahifa rasm matn konvert document page image text format "
+    "report table letter invoice contract summary appendix chapter section"
+).split()
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _paragraph(rng: random.Random) -> str:
+    return " ".join(_sentence(rng, rng.randint(6, 18)) for _ in range(rng.randint(2, 6)))
+
+
+def text_body(characters: int, seed: int = SEED) -> str:
+    rng = random.Random(seed)
+    paragraphs: List[str] = []
+    size = 0
+    while size < characters:
+        paragraph = _paragraph(rng)
+        paragraphs.append(paragraph)
+        size += len(paragraph) + 1
+    return "\n".join(paragraphs)[:characters]
+
+
+def jpeg_album(directory: Path, count: int, width: int, height: int, seed: int = SEED) -> List[Path]:
+    paths = []
+    for index in range(count):
+        path = directory / f"album-{width}x{height}-{index}.jpg"
+        paths.append(path)
+        if path.exists():
+            continue
+        rng = random.Random(seed + index)
+        noise = Image.effect_noise((width // 8, height // 8), rng.randint(40, 90)).resize((width, height))
+        gradient = Image.linear_gradient("L").resize((width, height))
+        color = (rng.randint(0, 255), rng.randint(0, 255), rng.randint(0, 255))
+        image = Image.merge("RGB", (noise, gradient, Image.new("L", (width, height), color[index % 3])))
+        image.save(path, "JPEG", quality=92)
+    return paths
+
+
+def pdf_document(directory: Path, pages: int, seed: int = SEED) -> Path:
+    path = directory / f"document-{pages}p.pdf"
+    if path.exists():
+        return path
+    rng = random.Random(seed)
+    pdf = canvas.Canvas(str(path), pagesize=A4)
+    _, height = A4
+    for number in range(pages):
+        pdf.setFont("Helvetica-Bold", 14)
+        pdf.drawString(50, height - 50, f"Page {number + 1}")
+        pdf.setFont("Helvetica", 10)
+        for line in range(60):
+            pdf.drawString(50, height - 80 - line * 12, _sentence(rng, 12))
+        pdf.showPage()
+    pdf.save()
+    return path
+
+
+def scanned_pdf(directory: Path, pages: int, seed: int = SEED) -> Path:
+    path = directory / f"scanned-{pages}p.pdf"
+    if path.exists():
+        return path
+    images = jpeg_album(directory, min(pages, 4), 4000, 3000, seed)
+    width, height = A4
+    pdf = canvas.Canvas(str(path), pagesize=A4)
+    for number in range(pages):
+        pdf.drawImage(str(images[number % len(images)]), 0, 0, width, height)
+        pdf.showPage()
+    pdf.save()
+    return path
+
+
+def docx_document(directory: Path, paragraphs: int, seed: int = SEED) -> Path:
+    path = directory / f"document-{paragraphs}par.docx"
+    if path.exists():
+        return path
+    rng = random.Random(seed)
+    document = Document()
+    document.add_heading("Benchmark document", level=1)
+    for index in range(paragraphs):
+        if index % 200 == 0:
+            document.add_heading(f"Section {index // 200 + 1}", level=2)
+        document.add_paragraph(_paragraph(rng))
+    document.save(path)
+    return path
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import json
+import platform
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from benchmarks.cases import CASES
+
+COMPARED_METRICS = ("wall_median", "peak_rss_mb")
+
+T = TypeVar("T")
+
+
+def _peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _in_subprocess(function: Callable[..., T], *args: Any) -> T:
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+        return executor.submit(function, *args).result()
+
+
+def prepare_case(name: str, directory: str, scale: float) -> None:
+    CASES[name].setup(Path(directory), scale)
+
+
+def measure_case(name: str, directory: str, scale: float, repeat: int) -> Dict[str, Any]:
+    case = CASES[name]
+    run, units = case.setup(Path(directory), scale)
+    baseline_rss = _peak_rss_mb()
+    wall: List[float] = []
+    cpu: List[float] = []
+    for _ in range(repeat):
+        wall_started = time.perf_counter()
+        cpu_started = time.process_time()
+        run()
+        cpu.append(time.process_time() - cpu_started)
+        wall.append(time.perf_counter() - wall_started)
+    peak_rss = _peak_rss_mb()
+    wall_median = statistics.median(wall)
+    return {
+        "unit": case.unit,
+        "units": units,
+        "wall_seconds": wall,
+        "cpu_seconds": cpu,
+        "wall_median": wall_median,
+        "cpu_median": statistics.median(cpu),
+        "throughput": units / wall_median if wall_median else None,
+        "peak_rss_mb": peak_rss,
+        "rss_growth_mb": peak_rss - baseline_rss if peak_rss is not None else None,
+    }
+
+
+def run_benchmarks(names: List[str], directory: Path, scale: float, repeat: int) -> Dict[str, Any]:
+    directory.mkdir(parents=True, exist_ok=True)
+    results: Dict[str, Any] = {}
+    for name in names:
+        # Corpus generation and measurement each get a fresh interpreter: Linux keeps
+        # ru_maxrss across exec, so a fat parent would inflate every child's peak.
+        _in_subprocess(prepare_case, name, str(directory), scale)
+        results[name] = _in_subprocess(measure_case, name, str(directory), scale, repeat)
+        print(_format_result(name, results[name]), flush=True)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "scale": scale,
+            "repeat": repeat,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "results": results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    regressions = []
+    for name, result in current["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if previous is None:
+            continue
+        for metric in COMPARED_METRICS:
+            new, old = result.get(metric), previous.get(metric)
+            if not new or not old:
+                continue
+            change = new / old - 1
+            if change > threshold:
+                regressions.append(f"{name}: {metric} {old:.3f} -> {new:.3f} (+{change:.0%})")
+    return regressions
+
+
+def _format_result(name: str, result: Dict[str, Any]) -> str:
+    rss = result["peak_rss_mb"]
+    rss_text = f"{rss:8.1f} MB" if rss is not None else "       n/a"
+    return (
+        f"{name:32} wall {result['wall_median']:8.3f}s  cpu {result['cpu_median']:8.3f}s  "
+        f"{result['throughput']:10.1f} {result['unit']}/s  peak {rss_text}"
+    )
+
+
+def load_results(path: Path) -> Dict[str, Any]:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def save_results(results: Dict[str, Any], path: Path) -> None:
+    path.write_text(json.dumps(results, indent=2), encoding="utf-8")
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from aiogram import BaseMiddleware
+from aiogram.dispatcher.flags import get_flag
+from aiogram.types import Message, TelegramObject
+
+
+class AlbumMiddleware(BaseMiddleware):
+    # Only handlers registered with flags={"album": True} receive grouped
+    # albums; every other handler still sees each album item on its own.
+    def __init__(self, latency: float = 0.5) -> None:
+        self._latency = latency
+        self._albums: Dict[Tuple[int, str], List[Message]] = {}
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        if not isinstance(event, Message) or event.media_group_id is None or not get_flag(data, "album"):
+            return await handler(event, data)
+
+        key = (event.chat.id, event.media_group_id)
+        album = self._albums.get(key)
+        if album is not None:
+            album.append(event)
+            return None
+
+        # Telegram delivers every album item as its own update. The first one
+        # waits until no more items arrive, then handles the whole group once.
+        album = self._albums[key] = [event]
+        try:
+            size = 0
+            while size != len(album):
+                size = len(album)
+                await asyncio.sleep(self._latency)
+        finally:
+            del self._albums[key]
+        album.sort(key=lambda message: message.message_id)
+        data["album"] = album
+        return await handler(album[0], data)
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional
+
+
+class ConversionCache:
+    # The bot and queue workers may share one directory. The disk index is
+    # only a view of it: misses fall back to the directory, and every write
+    # rescans it so CACHE_DISK_MB holds for all processes together. Recency is
+    # the file mtime, which reads refresh, so eviction order is shared too.
+    def __init__(self, directory: Path, max_disk_bytes: int, max_memory_bytes: int) -> None:
+        self._directory = directory
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._max_disk_bytes = max_disk_bytes
+        self._max_memory_bytes = max_memory_bytes
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_size = 0
+        self._disk: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_size = 0
+        self._load_disk_index()
+
+    @staticmethod
+    def make_key(file_unique_id: str, operation: str, **params: Any) -> str:
+        payload = json.dumps([file_unique_id, operation, params], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        data = self._memory.get(key)
+        if data is not None:
+            self._memory.move_to_end(key)
+            return data
+        name = self._name(key)
+        path = self._disk_path(name)
+        if path is None:
+            return None
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            self._disk_size -= self._disk.pop(name)
+            return None
+        os.utime(path)
+        self._disk.move_to_end(name)
+        self._remember(key, data)
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        self._remember(key, data)
+        if len(data) > self._max_disk_bytes:
+            return
+        temp_path = self._temp_path(key)
+        temp_path.write_bytes(data)
+        self._commit_disk(key, temp_path)
+
+    def copy_to(self, key: str, destination: Path) -> bool:
+        data = self._memory.get(key)
+        if data is not None:
+            self._memory.move_to_end(key)
+            destination.write_bytes(data)
+            return True
+        name = self._name(key)
+        path = self._disk_path(name)
+        if path is None:
+            return False
+        try:
+            shutil.copyfile(path, destination)
+        except FileNotFoundError:
+            self._disk_size -= self._disk.pop(name)
+            return False
+        os.utime(path)
+        self._disk.move_to_end(name)
+        return True
+
+    def put_file(self, key: str, source: Path) -> None:
+        if source.stat().st_size > self._max_disk_bytes:
+            return
+        temp_path = self._temp_path(key)
+        shutil.copyfile(source, temp_path)
+        self._commit_disk(key, temp_path)
+
+    def get_file_id(self, key: str) -> Optional[str]:
+        data = self.get(f"file_id:{key}")
+        return data.decode("utf-8") if data is not None else None
+
+    def set_file_id(self, key: str, file_id: str) -> None:
+        self.put(f"file_id:{key}", file_id.encode("utf-8"))
+
+    @staticmethod
+    def _name(key: str) -> str:
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def _temp_path(self, key: str) -> Path:
+        # Per-process name: two processes may store the same key at once.
+        return self._directory / f"{self._name(key)}.{os.getpid()}.tmp"
+
+    def _disk_path(self, name: str) -> Optional[Path]:
+        path = self._directory / name
+        if name not in self._disk:
+            try:
+                size = path.stat().st_size
+            except FileNotFoundError:
+                return None
+            self._disk[name] = size
+            self._disk_size += size
+        return path
+
+    def _commit_disk(self, key: str, temp_path: Path) -> None:
+        os.replace(temp_path, self._directory / self._name(key))
+        self._load_disk_index()
+
+    def _remember(self, key: str, data: bytes) -> None:
+        if len(data) > self._max_memory_bytes:
+            return
+        if key in self._memory:
+            self._memory_size -= len(self._memory.pop(key))
+        self._memory[key] = data
+        self._memory_size += len(data)
+        while self._memory_size > self._max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_size -= len(evicted)
+
+    def _load_disk_index(self) -> None:
+        self._disk.clear()
+        self._disk_size = 0
+        entries = []
+        for path in self._directory.iterdir():
+            if not path.is_file() or path.suffix:
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, path.name, stat.st_size))
+        for _, name, size in sorted(entries):
+            self._disk[name] = size
+            self._disk_size += size
+        self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        while self._disk_size > self._max_disk_bytes and self._disk:
+            name, size = self._disk.popitem(last=False)
+            self._disk_size -= size
+            try:
+                os.remove(self._directory / name)
+            except FileNotFoundError:
+                continue
@@ -1,23 +1,199 @@
 from __future__ import annotations
 
 import os
-from dataclasses import dataclass
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
 
 
 @dataclass(frozen=True)
 class BotConfig:
     token: str
     max_file_size_mb: int = 20
+    max_text_size_mb: int = 20
+    max_pdf_pages: int = 500
+    max_input_pages: int = 5000
+    max_image_pixels: int = 50_000_000
+    docx_template: Path | None = None
+    fonts_dir: Path | None = None
+    album_latency: float = 0.5
+    download_concurrency: int = 4
+    http_connections: int = 100
+    api_url: str | None = None
+    api_local: bool = False
+    api_server_dir: Path | None = None
+    api_local_dir: Path | None = None
+    temp_file_max_age: float = 86400.0
+
+
+@dataclass(frozen=True)
+class WorkerConfig:
+    processes: int = 2
+    max_concurrent_jobs: int = 4
+    warm_up: bool = False
+    job_timeout: float | None = 120.0
+    job_timeouts: dict[str, float | None] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class CacheConfig:
+    directory: Path = Path(tempfile.gettempdir()) / "konvertchi-cache"
+    max_disk_mb: int = 1024
+    max_memory_mb: int = 64
+
+
+@dataclass(frozen=True)
+class WebhookConfig:
+    enabled: bool = False
+    host: str = "0.0.0.0"
+    port: int = 8080
+    path: str = "/webhook"
+    secret: str | None = None
+    base_url: str | None = None
+
+
+@dataclass(frozen=True)
+class QueueConfig:
+    path: Path | None = None
+    poll_interval: float = 1.0
+
+
+@dataclass(frozen=True)
+class ThrottlingConfig:
+    rate_per_minute: int = 60
+    burst: int = 40
+    max_active_handlers: int = 32
+    max_jobs_per_user: int = 2
+    max_queued_per_user: int = 50
+
+
+@dataclass(frozen=True)
+class MetricsConfig:
+    host: str = "0.0.0.0"
+    port: int | None = None
+
+
+@dataclass(frozen=True)
+class StorageConfig:
+    path: Path | None = None
+    max_cached_users: int = 10_000
+    commit_interval: float = 1.0
 
 
 @dataclass(frozen=True)
 class AppConfig:
     bot: BotConfig
+    workers: WorkerConfig = field(default_factory=WorkerConfig)
+    cache: CacheConfig = field(default_factory=CacheConfig)
+    webhook: WebhookConfig = field(default_factory=WebhookConfig)
+    queue: QueueConfig = field(default_factory=QueueConfig)
+    throttling: ThrottlingConfig = field(default_factory=ThrottlingConfig)
+    metrics: MetricsConfig = field(default_factory=MetricsConfig)
+    storage: StorageConfig = field(default_factory=StorageConfig)
+
+
+def _timeout(value: str) -> float | None:
+    seconds = float(value)
+    return seconds if seconds > 0 else None
+
+
+def _parse_timeouts(value: str) -> dict[str, float | None]:
+    # "merge_pdfs=300,compress_pdf=180"; 0 disables the deadline for that method.
+    timeouts = {}
+    for item in value.split(","):
+        if item.strip():
+            name, seconds = item.split("=", 1)
+            timeouts[name.strip()] = _timeout(seconds)
+    return timeouts
 
 
 def load_config() -> AppConfig:
     token = os.getenv("BOT_TOKEN")
     if not token:
         raise RuntimeError("BOT_TOKEN is not set")
-    max_file_size_mb = int(os.getenv("MAX_FILE_SIZE_MB", "20"))
-    return AppConfig(bot=BotConfig(token=token, max_file_size_mb=max_file_size_mb))
+    api_url = os.getenv("BOT_API_URL") or None
+    # Local mode only means something for a self-hosted server; api.telegram.org
+    # still caps downloads at 20 MB.
+    api_local = api_url is not None and os.getenv("BOT_API_LOCAL", "0").lower() in {"1", "true", "yes"}
+    api_server_dir = os.getenv("BOT_API_SERVER_DIR")
+    api_local_dir = os.getenv("BOT_API_LOCAL_DIR")
+    # A local Bot API server accepts files up to 2000 MB instead of 20 MB.
+    max_file_size_mb = int(os.getenv("MAX_FILE_SIZE_MB", "2000" if api_local else "20"))
+    # TXT bodies are read into memory and pickled to a worker whole, so they
+    # keep a small cap of their own whatever the server allows.
+    max_text_size_mb = int(os.getenv("MAX_TEXT_SIZE_MB", str(BotConfig.max_text_size_mb)))
+    max_pdf_pages = int(os.getenv("MAX_PDF_PAGES", str(BotConfig.max_pdf_pages)))
+    docx_template = os.getenv("DOCX_TEMPLATE_PATH")
+    fonts_dir = os.getenv("FONTS_DIR")
+    processes = int(os.getenv("WORKER_PROCESSES", str(os.cpu_count() or 2)))
+    max_concurrent_jobs = int(os.getenv("MAX_CONCURRENT_JOBS", str(processes * 2)))
+    cache_directory = os.getenv("CACHE_DIR")
+    cache = CacheConfig(
+        directory=Path(cache_directory) if cache_directory else CacheConfig.directory,
+        max_disk_mb=int(os.getenv("CACHE_DISK_MB", str(CacheConfig.max_disk_mb))),
+        max_memory_mb=int(os.getenv("CACHE_MEMORY_MB", str(CacheConfig.max_memory_mb))),
+    )
+    webhook = WebhookConfig(
+        enabled=os.getenv("BOT_MODE", "polling") == "webhook",
+        host=os.getenv("WEBHOOK_HOST", WebhookConfig.host),
+        port=int(os.getenv("WEBHOOK_PORT", str(WebhookConfig.port))),
+        path=os.getenv("WEBHOOK_PATH", WebhookConfig.path),
+        secret=os.getenv("WEBHOOK_SECRET") or None,
+        base_url=os.getenv("WEBHOOK_BASE_URL") or None,
+    )
+    queue_path = os.getenv("JOB_QUEUE_PATH")
+    queue = QueueConfig(
+        path=Path(queue_path) if queue_path else None,
+        poll_interval=float(os.getenv("JOB_POLL_INTERVAL", str(QueueConfig.poll_interval))),
+    )
+    throttling = ThrottlingConfig(
+        rate_per_minute=int(os.getenv("RATE_LIMIT_PER_MINUTE", str(ThrottlingConfig.rate_per_minute))),
+        burst=int(os.getenv("RATE_LIMIT_BURST", str(ThrottlingConfig.burst))),
+        max_active_handlers=int(os.getenv("MAX_ACTIVE_HANDLERS", str(ThrottlingConfig.max_active_handlers))),
+        max_jobs_per_user=int(os.getenv("MAX_JOBS_PER_USER", str(ThrottlingConfig.max_jobs_per_user))),
+        max_queued_per_user=int(os.getenv("MAX_QUEUED_PER_USER", str(ThrottlingConfig.max_queued_per_user))),
+    )
+    metrics_port = os.getenv("METRICS_PORT")
+    metrics = MetricsConfig(
+        host=os.getenv("METRICS_HOST", MetricsConfig.host),
+        port=int(metrics_port) if metrics_port else None,
+    )
+    storage_path = os.getenv("STORAGE_PATH")
+    storage = StorageConfig(
+        path=Path(storage_path) if storage_path else None,
+        max_cached_users=int(os.getenv("STORAGE_CACHE_USERS", str(StorageConfig.max_cached_users))),
+        commit_interval=float(os.getenv("STORAGE_COMMIT_INTERVAL", str(StorageConfig.commit_interval))),
+    )
+    return AppConfig(
+        bot=BotConfig(
+            token=token,
+            max_file_size_mb=max_file_size_mb,
+            max_text_size_mb=max_text_size_mb,
+            max_pdf_pages=max_pdf_pages,
+            max_input_pages=int(os.getenv("MAX_INPUT_PAGES", str(BotConfig.max_input_pages))),
+            max_image_pixels=int(os.getenv("MAX_IMAGE_PIXELS", str(BotConfig.max_image_pixels))),
+            docx_template=Path(docx_template) if docx_template else None,
+            fonts_dir=Path(fonts_dir) if fonts_dir else None,
+            album_latency=float(os.getenv("ALBUM_LATENCY", str(BotConfig.album_latency))),
+            download_concurrency=int(os.getenv("DOWNLOAD_CONCURRENCY", str(BotConfig.download_concurrency))),
+            http_connections=int(os.getenv("HTTP_CONNECTIONS", str(BotConfig.http_connections))),
+            api_url=api_url,
+            api_local=api_local,
+            api_server_dir=Path(api_server_dir) if api_server_dir else None,
+            api_local_dir=Path(api_local_dir) if api_local_dir else None,
+            temp_file_max_age=float(os.getenv("TEMP_FILE_MAX_AGE", str(BotConfig.temp_file_max_age))),
+        ),
+        workers=WorkerConfig(
+            processes=processes,
+            max_concurrent_jobs=max_concurrent_jobs,
+            warm_up=os.getenv("WARMUP_ENGINES", "0").lower() in {"1", "true", "yes"},
+            job_timeout=_timeout(os.getenv("JOB_TIMEOUT", str(WorkerConfig.job_timeout))),
+            job_timeouts=_parse_timeouts(os.getenv("JOB_TIMEOUTS", "")),
+        ),
+        cache=cache,
+        webhook=webhook,
+        queue=queue,
+        throttling=throttling,
+        metrics=metrics,
+        storage=storage,
+    )
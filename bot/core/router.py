@@ -2,10 +2,33 @@ from __future__ import annotations
 
 from aiogram import Router
 
+from bot.core.album import AlbumMiddleware
+from bot.core.config import AppConfig
+from bot.core.metrics import MetricsMiddleware
+from bot.core.throttling import FairScheduler, ThrottlingMiddleware
 from bot.handlers import documents, start
 
 
-def setup_router() -> Router:
+def setup_router(config: AppConfig) -> Router:
+    throttling = ThrottlingMiddleware(
+        FairScheduler(
+            max_active=config.throttling.max_active_handlers,
+            max_per_user=config.throttling.max_jobs_per_user,
+        ),
+        rate=config.throttling.rate_per_minute / 60,
+        burst=config.throttling.burst,
+        max_queued=config.throttling.max_queued_per_user,
+    )
+    metrics = MetricsMiddleware()
+    # Registered first so the extra updates of an album never reach metrics or throttling.
+    # Only handlers flagged with "album" group media; see AlbumMiddleware.
+    documents.router.message.middleware(AlbumMiddleware(latency=config.bot.album_latency))
+    for handlers_router in (start.router, documents.router):
+        handlers_router.message.middleware(metrics)
+        handlers_router.callback_query.middleware(metrics)
+    documents.router.message.middleware(throttling)
+    documents.router.callback_query.middleware(throttling)
+
     router = Router()
     router.include_router(start.router)
     router.include_router(documents.router)
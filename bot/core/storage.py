@@ -1,9 +1,31 @@
 from __future__ import annotations
 
-from typing import Dict
+import asyncio
+import json
+import sqlite3
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Sequence
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, DefaultKeyBuilder, KeyBuilder, StateType, StorageKey
 
 from bot.models.user import UserSettings
 
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS user_settings (
+    user_id INTEGER PRIMARY KEY,
+    language TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS fsm (
+    key TEXT PRIMARY KEY,
+    state TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS fsm_state ON fsm (state) WHERE state IS NOT NULL;
+"""
+
 
 class UserSettingsStore:
     def __init__(self) -> None:
@@ -16,3 +38,143 @@ class UserSettingsStore:
         settings = self.get(user_id)
         settings.language = language
         self._settings[user_id] = settings
+
+
+class SQLiteDatabase:
+    def __init__(self, path: Path, commit_interval: float = 1.0, max_pending: int = 200) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(path)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(SCHEMA)
+        self._commit_interval = commit_interval
+        self._max_pending = max_pending
+        self._pending = 0
+
+    def query(self, sql: str, params: Sequence[Any] = ()) -> Optional[tuple]:
+        return self._connection.execute(sql, params).fetchone()
+
+    def write(self, sql: str, params: Sequence[Any] = ()) -> None:
+        # Write-through, but commit in batches: every max_pending writes or every
+        # commit_interval seconds via flush_periodically, whichever comes first.
+        self._connection.execute(sql, params)
+        self._pending += 1
+        if self._pending >= self._max_pending:
+            self.commit()
+
+    def commit(self) -> None:
+        if self._pending:
+            self._connection.commit()
+            self._pending = 0
+
+    async def flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self._commit_interval)
+            self.commit()
+
+    def close(self) -> None:
+        self.commit()
+        self._connection.close()
+
+
+class SQLiteUserSettingsStore(UserSettingsStore):
+    def __init__(self, database: SQLiteDatabase, max_cached: int = 10_000) -> None:
+        super().__init__()
+        self._database = database
+        self._max_cached = max_cached
+        self._cache: OrderedDict[int, UserSettings] = OrderedDict()
+
+    def get(self, user_id: int) -> UserSettings:
+        settings = self._cache.get(user_id)
+        if settings is not None:
+            self._cache.move_to_end(user_id)
+            return settings
+        row = self._database.query("SELECT language FROM user_settings WHERE user_id = ?", (user_id,))
+        settings = UserSettings(user_id=user_id, language=row[0]) if row else UserSettings(user_id=user_id)
+        self._remember(settings)
+        return settings
+
+    def set_language(self, user_id: int, language: str) -> None:
+        self._database.write(
+            "INSERT INTO user_settings (user_id, language) VALUES (?, ?)"
+            " ON CONFLICT (user_id) DO UPDATE SET language = excluded.language",
+            (user_id, language),
+        )
+        self._remember(UserSettings(user_id=user_id, language=language))
+
+    def _remember(self, settings: UserSettings) -> None:
+        self._cache[settings.user_id] = settings
+        self._cache.move_to_end(settings.user_id)
+        while len(self._cache) > self._max_cached:
+            self._cache.popitem(last=False)
+
+
+@dataclass
+class FSMRecord:
+    state: Optional[str] = None
+    data: Dict[str, Any] = field(default_factory=dict)
+
+
+class SQLiteStorage(BaseStorage):
+    def __init__(
+        self,
+        database: SQLiteDatabase,
+        max_cached: int = 10_000,
+        key_builder: Optional[KeyBuilder] = None,
+    ) -> None:
+        self._database = database
+        self._max_cached = max_cached
+        self._key_builder = key_builder or DefaultKeyBuilder()
+        self._cache: OrderedDict[str, FSMRecord] = OrderedDict()
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        storage_key = self._key_builder.build(key)
+        record = self._load(storage_key)
+        record.state = state.state if isinstance(state, State) else state
+        self._save(storage_key, record)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        return self._load(self._key_builder.build(key)).state
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        storage_key = self._key_builder.build(key)
+        record = self._load(storage_key)
+        record.data = dict(data)
+        self._save(storage_key, record)
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        return self._load(self._key_builder.build(key)).data.copy()
+
+    async def close(self) -> None:
+        self._database.commit()
+
+    def active_sessions(self) -> int:
+        row = self._database.query("SELECT COUNT(*) FROM fsm WHERE state IS NOT NULL")
+        return row[0] if row else 0
+
+    def _load(self, key: str) -> FSMRecord:
+        record = self._cache.get(key)
+        if record is not None:
+            self._cache.move_to_end(key)
+            return record
+        row = self._database.query("SELECT state, data FROM fsm WHERE key = ?", (key,))
+        record = FSMRecord(state=row[0], data=json.loads(row[1])) if row else FSMRecord()
+        self._remember(key, record)
+        return record
+
+    def _save(self, key: str, record: FSMRecord) -> None:
+        if record.state is None and not record.data:
+            self._database.write("DELETE FROM fsm WHERE key = ?", (key,))
+        else:
+            self._database.write(
+                "INSERT INTO fsm (key, state, data) VALUES (?, ?, ?)"
+                " ON CONFLICT (key) DO UPDATE SET state = excluded.state, data = excluded.data",
+                (key, record.state, json.dumps(record.data)),
+            )
+        self._remember(key, record)
+
+    def _remember(self, key: str, record: FSMRecord) -> None:
+        self._cache[key] = record
+        self._cache.move_to_end(key)
+        while len(self._cache) > self._max_cached:
+            self._cache.popitem(last=False)
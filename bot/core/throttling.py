@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import CallbackQuery, Message, TelegramObject
+
+from bot.i18n import t
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: int) -> None:
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def consume(self) -> bool:
+        self._refill()
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def is_full(self) -> bool:
+        self._refill()
+        return self._tokens >= self._capacity
+
+
+class FairScheduler:
+    def __init__(self, max_active: int, max_per_user: int) -> None:
+        self._max_active = max_active
+        self._max_per_user = max_per_user
+        self._active = 0
+        self._in_flight: Dict[int, int] = {}
+        self._waiting: "OrderedDict[int, Deque[asyncio.Future[None]]]" = OrderedDict()
+
+    def queued(self, user_id: int) -> int:
+        return len(self._waiting.get(user_id, ()))
+
+    @asynccontextmanager
+    async def slot(self, user_id: int) -> AsyncIterator[None]:
+        await self._acquire(user_id)
+        try:
+            yield
+        finally:
+            self._release(user_id)
+
+    def _can_start(self, user_id: int) -> bool:
+        return self._active < self._max_active and self._in_flight.get(user_id, 0) < self._max_per_user
+
+    def _start(self, user_id: int) -> None:
+        self._active += 1
+        self._in_flight[user_id] = self._in_flight.get(user_id, 0) + 1
+
+    async def _acquire(self, user_id: int) -> None:
+        if user_id not in self._waiting and self._can_start(user_id):
+            self._start(user_id)
+            return
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiting.setdefault(user_id, deque()).append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._release(user_id)
+            else:
+                self._discard(user_id, waiter)
+            raise
+
+    def _release(self, user_id: int) -> None:
+        self._active -= 1
+        remaining = self._in_flight.get(user_id, 1) - 1
+        if remaining:
+            self._in_flight[user_id] = remaining
+        else:
+            self._in_flight.pop(user_id, None)
+        self._wake()
+
+    def _discard(self, user_id: int, waiter: asyncio.Future[None]) -> None:
+        waiters = self._waiting.get(user_id)
+        if waiters is None:
+            return
+        try:
+            waiters.remove(waiter)
+        except ValueError:
+            pass
+        if not waiters:
+            del self._waiting[user_id]
+        self._wake()
+
+    def _wake(self) -> None:
+        for user_id in list(self._waiting):
+            if self._active >= self._max_active:
+                return
+            if not self._can_start(user_id):
+                continue
+            waiters = self._waiting.pop(user_id)
+            waiter = waiters.popleft()
+            if waiters:
+                self._waiting[user_id] = waiters
+            self._start(user_id)
+            waiter.set_result(None)
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    def __init__(self, scheduler: FairScheduler, rate: float, burst: int, max_queued: int) -> None:
+        self._scheduler = scheduler
+        self._rate = rate
+        self._burst = burst
+        self._max_queued = max_queued
+        self._buckets: Dict[int, TokenBucket] = {}
+
+    def _bucket(self, user_id: int) -> TokenBucket:
+        bucket = self._buckets.get(user_id)
+        if bucket is None:
+            if len(self._buckets) >= 10_000:
+                self._buckets = {key: value for key, value in self._buckets.items() if not value.is_full()}
+            bucket = self._buckets[user_id] = TokenBucket(self._rate, self._burst)
+        return bucket
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        user = data.get("event_from_user")
+        if user is None:
+            return await handler(event, data)
+
+        if self._scheduler.queued(user.id) >= self._max_queued or not self._bucket(user.id).consume():
+            settings = data.get("settings")
+            language = settings.get(user.id).language if settings else "ru"
+            if isinstance(event, CallbackQuery):
+                await event.answer(t(language, "rate_limited"))
+            elif isinstance(event, Message):
+                await event.answer(t(language, "rate_limited"))
+            return None
+
+        async with self._scheduler.slot(user.id):
+            return await handler(event, data)
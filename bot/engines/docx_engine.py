@@ -1,32 +1,228 @@
 from __future__ import annotations
 
+import posixpath
+import zipfile
 from io import BytesIO
-from typing import Optional
+from typing import Dict, Iterator, List, Optional, Tuple
+from xml.sax.saxutils import escape
 
-from docx import Document
+from lxml import etree
+from PIL.Image import DecompressionBombError
+from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import ParagraphStyle
-from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+from reportlab.platypus import Flowable, Image, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
 
+from bot.engines.fonts import FontSet, register_fonts
+from bot.engines.image_engine import MAX_IMAGE_DPI, cleanup_prepared, prepare_image
+from bot.engines.templates import FlowableStream, paragraph_style
+from bot.models.documents import PreparedImage
+from bot.utils.files import InputSource, open_source
 
-def docx_to_pdf(docx_bytes: bytes, title: Optional[str] = None) -> bytes:
-    document = Document(BytesIO(docx_bytes))
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+R = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+A = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+WP = "{http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing}"
+PACKAGE_RELS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+OFFICE_DOCUMENT = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+
+EMU_PER_POINT = 12700
+FALSE_VALUES = {"0", "false", "off"}
+
+Drawing = Tuple[str, Optional[Tuple[float, float]]]
+
+
+def _read_relationships(archive: zipfile.ZipFile, part: str) -> Dict[str, str]:
+    directory, name = posixpath.split(part)
+    rels_name = posixpath.join(directory, "_rels", f"{name}.rels")
+    if rels_name not in archive.namelist():
+        return {}
+    root = etree.fromstring(archive.read(rels_name))
+    targets = {}
+    for relationship in root.iter(f"{PACKAGE_RELS}Relationship"):
+        if relationship.get("TargetMode") == "External":
+            continue
+        target = relationship.get("Target", "")
+        if target.startswith("/"):
+            targets[relationship.get("Id")] = target.lstrip("/")
+        else:
+            targets[relationship.get("Id")] = posixpath.normpath(posixpath.join(directory, target))
+    return targets
+
+
+def _main_part(archive: zipfile.ZipFile) -> str:
+    root = etree.fromstring(archive.read("_rels/.rels"))
+    for relationship in root.iter(f"{PACKAGE_RELS}Relationship"):
+        if relationship.get("Type") == OFFICE_DOCUMENT:
+            return relationship.get("Target", "").lstrip("/")
+    return "word/document.xml"
+
+
+def _is_on(properties: Optional[etree._Element], tag: str) -> bool:
+    if properties is None:
+        return False
+    element = properties.find(tag)
+    return element is not None and element.get(f"{W}val", "true").lower() not in FALSE_VALUES
+
+
+def _paragraph_markup(paragraph: etree._Element) -> Tuple[str, List[Drawing]]:
+    parts: List[str] = []
+    drawings: List[Drawing] = []
+    for run in paragraph.iter(f"{W}r"):
+        properties = run.find(f"{W}rPr")
+        text: List[str] = []
+        for child in run:
+            if child.tag == f"{W}t":
+                text.append(escape(child.text or ""))
+            elif child.tag == f"{W}tab":
+                text.append("    ")
+            elif child.tag in {f"{W}br", f"{W}cr"}:
+                text.append("<br/>")
+            elif child.tag == f"{W}drawing":
+                blip = child.find(f".//{A}blip")
+                if blip is None or blip.get(f"{R}embed") is None:
+                    continue
+                extent = child.find(f".//{WP}extent")
+                size = None
+                if extent is not None:
+                    size = (int(extent.get("cx", 0)) / EMU_PER_POINT, int(extent.get("cy", 0)) / EMU_PER_POINT)
+                drawings.append((blip.get(f"{R}embed"), size if size and all(size) else None))
+        run_markup = "".join(text)
+        if not run_markup:
+            continue
+        if _is_on(properties, f"{W}b"):
+            run_markup = f"<b>{run_markup}</b>"
+        if _is_on(properties, f"{W}i"):
+            run_markup = f"<i>{run_markup}</i>"
+        parts.append(run_markup)
+    return "".join(parts).strip(), drawings
+
+
+def _is_block(element: etree._Element) -> bool:
+    # Body-level paragraphs and tables, including those wrapped in content controls.
+    parent = element.getparent()
+    while parent is not None and parent.tag in {f"{W}sdtContent", f"{W}sdt"}:
+        parent = parent.getparent()
+    return parent is not None and parent.tag == f"{W}body"
+
+
+def _is_heading(paragraph: etree._Element) -> bool:
+    style = paragraph.find(f"{W}pPr/{W}pStyle")
+    value = (style.get(f"{W}val", "") if style is not None else "").lower()
+    return value.startswith("heading") or value == "title"
+
+
+class _Converter:
+    def __init__(
+        self,
+        archive: zipfile.ZipFile,
+        pdf: SimpleDocTemplate,
+        fonts: FontSet,
+        max_dpi: int,
+        prepared: List[PreparedImage],
+    ) -> None:
+        self.archive = archive
+        self.part = _main_part(archive)
+        self.relationships = _read_relationships(archive, self.part)
+        self.frame = (pdf.width, pdf.height - 24)
+        self.max_dpi = max_dpi
+        self.prepared = prepared
+        self.body_style = paragraph_style("Body", fontName=fonts.regular, fontSize=12, leading=16)
+        self.heading_style = paragraph_style("Heading", fontName=fonts.bold, fontSize=14, leading=18)
+        self.cell_style = paragraph_style("Cell", fontName=fonts.regular, fontSize=10, leading=13)
+
+    def flowables(self) -> Iterator[Flowable]:
+        with self.archive.open(self.part) as stream:
+            for _, element in etree.iterparse(stream, events=("end",), tag=(f"{W}p", f"{W}tbl")):
+                if not _is_block(element):
+                    continue
+                if element.tag == f"{W}p":
+                    yield from self._paragraph(element)
+                else:
+                    yield from self._table(element)
+                element.clear()
+                parent = element.getparent()
+                if parent.tag == f"{W}body":
+                    while element.getprevious() is not None:
+                        del parent[0]
+
+    def _paragraph(self, paragraph: etree._Element) -> Iterator[Flowable]:
+        markup, drawings = _paragraph_markup(paragraph)
+        if not markup and not drawings:
+            yield Spacer(1, 8)
+            return
+        if markup:
+            yield Paragraph(markup, self.heading_style if _is_heading(paragraph) else self.body_style)
+            yield Spacer(1, 6)
+        for relationship_id, size in drawings:
+            image = self._image(relationship_id, size)
+            if image is not None:
+                yield image
+                yield Spacer(1, 6)
+
+    def _image(self, relationship_id: str, size: Optional[Tuple[float, float]]) -> Optional[Flowable]:
+        target = self.relationships.get(relationship_id)
+        if target is None:
+            return None
+        box = self.frame
+        if size is not None:
+            box = (min(size[0], self.frame[0]), min(size[1], self.frame[1]))
+        try:
+            prepared = prepare_image(self.archive.read(target), max_dpi=self.max_dpi, box=box)
+        except (KeyError, OSError, DecompressionBombError):
+            # Missing parts, formats Pillow cannot read (EMF, WMF) and oversized images are skipped.
+            return None
+        self.prepared.append(prepared)
+        return Image(prepared.path, width=prepared.width, height=prepared.height)
+
+    def _table(self, table: etree._Element) -> Iterator[Flowable]:
+        rows = []
+        for row in table.iterchildren(f"{W}tr"):
+            cells = []
+            for cell in row.iterchildren(f"{W}tc"):
+                lines = [_paragraph_markup(paragraph)[0] for paragraph in cell.iterchildren(f"{W}p")]
+                cells.append(Paragraph("<br/>".join(line for line in lines if line), self.cell_style))
+            if cells:
+                rows.append(cells)
+        if not rows:
+            return
+        columns = max(len(row) for row in rows)
+        for row in rows:
+            row.extend(Paragraph("", self.cell_style) for _ in range(columns - len(row)))
+        flowable = Table(rows, colWidths=[self.frame[0] / columns] * columns)
+        flowable.setStyle(
+            TableStyle(
+                [
+                    ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+                    ("VALIGN", (0, 0), (-1, -1), "TOP"),
+                ]
+            )
+        )
+        yield flowable
+        yield Spacer(1, 6)
+
+
+def docx_to_pdf(
+    source: InputSource,
+    title: Optional[str] = None,
+    fonts: Optional[FontSet] = None,
+    max_dpi: int = MAX_IMAGE_DPI,
+) -> bytes:
+    fonts = fonts or register_fonts()
     buffer = BytesIO()
     pdf = SimpleDocTemplate(buffer, pagesize=A4)
+    prepared: List[PreparedImage] = []
 
-    elements = []
-    if title:
-        elements.append(Paragraph(f"<b>{title}</b>", ParagraphStyle(name="Title", fontSize=16)))
-        elements.append(Spacer(1, 12))
+    with open_source(source) as handle, zipfile.ZipFile(handle) as archive:
+        converter = _Converter(archive, pdf, fonts, max_dpi, prepared)
 
-    body_style = ParagraphStyle(name="Body", fontSize=12, leading=16)
-    for paragraph in document.paragraphs:
-        text = paragraph.text.strip()
-        if not text:
-            elements.append(Spacer(1, 8))
-            continue
-        elements.append(Paragraph(text.replace("\n", "<br />"), body_style))
-        elements.append(Spacer(1, 6))
+        def flowables() -> Iterator[Flowable]:
+            if title:
+                yield Paragraph(f"<b>{title}</b>", paragraph_style("Title", fontName=fonts.regular, fontSize=16))
+                yield Spacer(1, 12)
+            yield from converter.flowables()
 
-    pdf.build(elements)
+        try:
+            pdf.build(FlowableStream(flowables()))
+        finally:
+            cleanup_prepared(prepared)
     return buffer.getvalue()
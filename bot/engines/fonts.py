@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFError, TTFont
+
+from bot.models.documents import TextStyle
+
+BUNDLED_FONTS_DIR = Path(__file__).resolve().parent.parent / "assets" / "fonts"
+
+SYSTEM_FONT_DIRS = (
+    Path("/usr/share/fonts/truetype/dejavu"),
+    Path("/usr/share/fonts/dejavu"),
+    Path("/usr/share/fonts/TTF"),
+    Path("/usr/share/fonts/truetype/liberation"),
+    Path("/usr/share/fonts/liberation"),
+    Path("/Library/Fonts"),
+    Path("C:/Windows/Fonts"),
+)
+
+# Families with Cyrillic and Latin Extended coverage, in order of preference:
+# name, then regular, bold, italic and bold-italic file names.
+FONT_FAMILIES: Tuple[Tuple[str, Tuple[str, str, str, str]], ...] = (
+    ("DejaVuSans", ("DejaVuSans.ttf", "DejaVuSans-Bold.ttf", "DejaVuSans-Oblique.ttf", "DejaVuSans-BoldOblique.ttf")),
+    (
+        "LiberationSans",
+        (
+            "LiberationSans-Regular.ttf",
+            "LiberationSans-Bold.ttf",
+            "LiberationSans-Italic.ttf",
+            "LiberationSans-BoldItalic.ttf",
+        ),
+    ),
+    ("Arial", ("arial.ttf", "arialbd.ttf", "ariali.ttf", "arialbi.ttf")),
+)
+
+
+@dataclass(frozen=True)
+class FontSet:
+    regular: str
+    bold: str
+    italic: str
+    bold_italic: str
+
+    def for_style(self, style: TextStyle) -> str:
+        return {
+            TextStyle.NORMAL: self.regular,
+            TextStyle.BOLD: self.bold,
+            TextStyle.ITALIC: self.italic,
+            TextStyle.BOLD_ITALIC: self.bold_italic,
+        }[style]
+
+
+HELVETICA = FontSet("Helvetica", "Helvetica-Bold", "Helvetica-Oblique", "Helvetica-BoldOblique")
+
+
+def _search_dirs(directory: Optional[str]) -> List[Path]:
+    dirs = [Path(directory)] if directory else []
+    return dirs + [BUNDLED_FONTS_DIR, *SYSTEM_FONT_DIRS]
+
+
+def _find_family(dirs: Iterable[Path], files: Tuple[str, ...]) -> Optional[List[Path]]:
+    for directory in dirs:
+        paths = [directory / name for name in files]
+        if all(path.is_file() for path in paths):
+            return paths
+    return None
+
+
+@lru_cache(maxsize=None)
+def register_fonts(directory: Optional[str] = None) -> FontSet:
+    # TTFont embeds only the glyphs a document uses, so registering full
+    # families keeps output small. The registry lives for the whole process.
+    dirs = _search_dirs(directory)
+    for family, files in FONT_FAMILIES:
+        paths = _find_family(dirs, files)
+        if paths is None:
+            continue
+        names = [family, f"{family}-Bold", f"{family}-Italic", f"{family}-BoldItalic"]
+        try:
+            for name, path in zip(names, paths):
+                pdfmetrics.registerFont(TTFont(name, str(path)))
+        except TTFError:
+            logging.exception("Could not load font family %s from %s", family, paths[0].parent)
+            continue
+        pdfmetrics.registerFontFamily(family, normal=names[0], bold=names[1], italic=names[2], boldItalic=names[3])
+        return FontSet(*names)
+    logging.warning("No TTF font family found in %s; Cyrillic text will not render", ", ".join(map(str, dirs)))
+    return HELVETICA
@@ -1,65 +1,210 @@
 from __future__ import annotations
 
+import shutil
+import zipfile
 from io import BytesIO
-from typing import Iterable, Optional, Tuple
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
 
-from PIL import Image
+from PIL import Image, ImageOps
+from reportlab import rl_config
 from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import mm
 from reportlab.lib.utils import ImageReader
 from reportlab.pdfgen import canvas
 
+from bot.engines.fonts import FontSet, register_fonts
+from bot.models.documents import ImageQuality, PreparedImage
+from bot.utils.files import InputSource, TempFile, cleanup_files, create_temp_file, open_source
+
 
 A4_WIDTH, A4_HEIGHT = A4
 PASSPORT_SIZE = (354, 472)
+# 354x472 px is 30x40 mm at 300 DPI; sheets are laid out at that print size.
+PASSPORT_PRINT_SIZE = (30 * mm, 40 * mm)
+SHEET_MARGIN = 10 * mm
+SHEET_GAP = 4 * mm
+MAX_IMAGE_DPI = 200
+JPEG_QUALITY = 90
+PASSTHROUGH_MODES = {"RGB", "L"}
+JPEG_SUFFIXES = {".jpg", ".jpeg"}
+EXIF_ORIENTATION = 0x0112
+# Uploads are checked from their headers before download. This is the backstop
+# for images nested in other files (DOCX media): Pillow refuses twice this size.
+MAX_IMAGE_PIXELS = 50_000_000
+
+# Target DPI over the fitted page area and JPEG quality for each preset. A DPI
+# of None keeps every source pixel, so plain JPEGs are embedded untouched.
+QUALITY_PRESETS: Dict[ImageQuality, Tuple[Optional[int], int]] = {
+    ImageQuality.SCREEN: (110, 75),
+    ImageQuality.PRINT: (300, 90),
+    ImageQuality.ORIGINAL: (None, 95),
+}
+
+rl_config.useA85 = 0
+Image.MAX_IMAGE_PIXELS = MAX_IMAGE_PIXELS
+
+
+def _fit_image(width: int, height: int, box: Optional[Tuple[float, float]] = None) -> Tuple[int, int]:
+    max_width, max_height = box or (A4_WIDTH - 80, A4_HEIGHT - 120)
+    ratio = min(max_width / width, max_height / height)
+    return max(1, int(width * ratio)), max(1, int(height * ratio))
+
+
+def _is_jpeg_path(source: InputSource) -> bool:
+    return isinstance(source, (str, Path)) and Path(source).suffix.lower() in JPEG_SUFFIXES
+
+
+def prepare_image(
+    source: InputSource,
+    max_dpi: Optional[int] = MAX_IMAGE_DPI,
+    box: Optional[Tuple[float, float]] = None,
+    quality: int = JPEG_QUALITY,
+) -> PreparedImage:
+    with open_source(source) as handle:
+        image = Image.open(handle)
+        orientation = image.getexif().get(EXIF_ORIENTATION, 1)
+        rotated = orientation in {5, 6, 7, 8}
+        width, height = (image.height, image.width) if rotated else image.size
+        draw_width, draw_height = _fit_image(width, height, box)
+        if max_dpi is None:
+            target = (width, height)
+        else:
+            target = (max(1, round(draw_width * max_dpi / 72)), max(1, round(draw_height * max_dpi / 72)))
+
+        if (
+            image.format == "JPEG"
+            and image.mode in PASSTHROUGH_MODES
+            and orientation == 1
+            and width <= target[0]
+            and height <= target[1]
+        ):
+            if _is_jpeg_path(source):
+                return PreparedImage(path=str(source), width=draw_width, height=draw_height, temporary=False)
+            temp_file = create_temp_file(".jpg")
+            handle.seek(0)
+            with open(temp_file.path, "wb") as output:
+                shutil.copyfileobj(handle, output)
+            return PreparedImage(path=str(temp_file.path), width=draw_width, height=draw_height, temporary=True)
+
+        image.draft("RGB", (target[1], target[0]) if rotated else target)
+        if orientation != 1:
+            image = ImageOps.exif_transpose(image)
+        image = image.convert("RGB")
+        image.thumbnail(target, Image.LANCZOS, reducing_gap=3.0)
 
-
-def _fit_image_to_a4(image: Image.Image) -> Tuple[int, int]:
-    max_width = A4_WIDTH - 80
-    max_height = A4_HEIGHT - 120
-    ratio = min(max_width / image.width, max_height / image.height)
-    return int(image.width * ratio), int(image.height * ratio)
+    temp_file = create_temp_file(".jpg")
+    image.save(temp_file.path, format="JPEG", quality=quality)
+    return PreparedImage(path=str(temp_file.path), width=draw_width, height=draw_height, temporary=True)
 
 
-def images_to_pdf(images: Iterable[bytes], title: Optional[str] = None) -> bytes:
+def render_images_pdf(
+    images: Iterable[PreparedImage],
+    title: Optional[str] = None,
+    fonts: Optional[FontSet] = None,
+) -> bytes:
+    fonts = fonts or register_fonts()
     buffer = BytesIO()
     pdf = canvas.Canvas(buffer, pagesize=A4)
 
-    for image_bytes in images:
-        image = Image.open(BytesIO(image_bytes))
-        image = image.convert("RGB")
-        new_width, new_height = _fit_image_to_a4(image)
-        resized = image.resize((new_width, new_height), Image.LANCZOS)
-
-        y_position = (A4_HEIGHT - new_height) / 2
+    for image in images:
+        y_position = (A4_HEIGHT - image.height) / 2
         if title:
-            pdf.setFont("Helvetica-Bold", 14)
+            pdf.setFont(fonts.bold, 14)
             pdf.drawCentredString(A4_WIDTH / 2, A4_HEIGHT - 40, title)
-            y_position = (A4_HEIGHT - new_height) / 2 - 10
+            y_position = (A4_HEIGHT - image.height) / 2 - 10
 
-        pdf.drawImage(ImageReader(resized), (A4_WIDTH - new_width) / 2, y_position, new_width, new_height)
+        pdf.drawImage(image.path, (A4_WIDTH - image.width) / 2, y_position, image.width, image.height)
         pdf.showPage()
 
     pdf.save()
     return buffer.getvalue()
 
 
-def image_to_passport(image_bytes: bytes, as_pdf: bool = False) -> bytes:
-    image = Image.open(BytesIO(image_bytes)).convert("RGB")
-    width, height = image.size
-    target_ratio = 3 / 4
-    current_ratio = width / height
+def cleanup_prepared(images: Iterable[PreparedImage]) -> None:
+    cleanup_files(TempFile(path=Path(image.path)) for image in images if image.temporary)
+
+
+def images_to_pdf(
+    images: Iterable[InputSource],
+    title: Optional[str] = None,
+    fonts: Optional[FontSet] = None,
+    quality: ImageQuality = ImageQuality.SCREEN,
+) -> bytes:
+    max_dpi, jpeg_quality = QUALITY_PRESETS[quality]
+    prepared: List[PreparedImage] = []
+    try:
+        for source in images:
+            prepared.append(prepare_image(source, max_dpi=max_dpi, quality=jpeg_quality))
+        return render_images_pdf(prepared, title=title, fonts=fonts)
+    finally:
+        cleanup_prepared(prepared)
+
+
+def _passport_crop(source: InputSource) -> Image.Image:
+    with open_source(source) as handle:
+        image = Image.open(handle)
+        orientation = image.getexif().get(EXIF_ORIENTATION, 1)
+        # draft() keeps both sides at or above the requested size, so the 3:4
+        # crop of the reduced image still covers the passport size.
+        image.draft("RGB", PASSPORT_SIZE[::-1] if orientation in {5, 6, 7, 8} else PASSPORT_SIZE)
+        if orientation != 1:
+            image = ImageOps.exif_transpose(image)
+        image = image.convert("RGB")
+    return ImageOps.fit(image, PASSPORT_SIZE, Image.LANCZOS)
+
+
+def prepare_passport(source: InputSource) -> PreparedImage:
+    temp_file = create_temp_file(".jpg")
+    _passport_crop(source).save(temp_file.path, format="JPEG", quality=95)
+    return PreparedImage(path=str(temp_file.path), width=PASSPORT_SIZE[0], height=PASSPORT_SIZE[1], temporary=True)
+
+
+def render_passport_sheet(images: Iterable[PreparedImage]) -> bytes:
+    buffer = BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=A4)
+    tile_width, tile_height = PASSPORT_PRINT_SIZE
+    columns = int((A4_WIDTH - 2 * SHEET_MARGIN + SHEET_GAP) // (tile_width + SHEET_GAP))
+    rows = int((A4_HEIGHT - 2 * SHEET_MARGIN + SHEET_GAP) // (tile_height + SHEET_GAP))
+
+    index = 0
+    for index, image in enumerate(images):
+        if index and index % (columns * rows) == 0:
+            pdf.showPage()
+        row, column = divmod(index % (columns * rows), columns)
+        x_position = SHEET_MARGIN + column * (tile_width + SHEET_GAP)
+        y_position = A4_HEIGHT - SHEET_MARGIN - tile_height - row * (tile_height + SHEET_GAP)
+        pdf.drawImage(image.path, x_position, y_position, tile_width, tile_height)
+        pdf.setStrokeGray(0.75)
+        pdf.setLineWidth(0.25)
+        pdf.rect(x_position, y_position, tile_width, tile_height)
+
+    pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+def render_passport_zip(images: Iterable[PreparedImage]) -> bytes:
+    buffer = BytesIO()
+    # The crops are already JPEG; deflating them again only costs time.
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as archive:
+        for index, image in enumerate(images, start=1):
+            archive.write(image.path, f"passport_{index:02d}.jpg")
+    return buffer.getvalue()
+
+
+def passport_batch(images: Iterable[InputSource], as_zip: bool = False) -> bytes:
+    prepared: List[PreparedImage] = []
+    try:
+        for source in images:
+            prepared.append(prepare_passport(source))
+        return render_passport_zip(prepared) if as_zip else render_passport_sheet(prepared)
+    finally:
+        cleanup_prepared(prepared)
 
-    if current_ratio > target_ratio:
-        new_width = int(height * target_ratio)
-        left = (width - new_width) // 2
-        box = (left, 0, left + new_width, height)
-    else:
-        new_height = int(width / target_ratio)
-        top = (height - new_height) // 2
-        box = (0, top, width, top + new_height)
 
-    cropped = image.crop(box)
-    resized = cropped.resize(PASSPORT_SIZE, Image.LANCZOS)
+def image_to_passport(source: InputSource, as_pdf: bool = False) -> bytes:
+    resized = _passport_crop(source)
 
     if not as_pdf:
         buffer = BytesIO()
@@ -1,29 +1,60 @@
 from __future__ import annotations
 
 from io import BytesIO
-from typing import Iterable
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, List, Optional
 
-from docx import Document
+from PIL import Image
 from pypdf import PdfReader, PdfWriter
+from pypdf.errors import PyPdfError
 
+from bot.engines.templates import TemplatePath, new_document
+from bot.models.documents import PageRange, PdfInfo, resolve_page_range
+from bot.utils.files import InputSource, open_source
 
-def merge_pdfs(pdf_files: Iterable[bytes]) -> bytes:
+if TYPE_CHECKING:
+    from pypdf._page import ImageFile
+
+COMPRESS_DPI = 150
+COMPRESS_QUALITY = 70
+# Bilevel and alpha images are left alone: JPEG would grow the former and
+# drop the latter.
+RECOMPRESS_MODES = {"RGB", "L", "P", "CMYK"}
+
+
+def inspect_pdf(source: InputSource) -> PdfInfo:
+    with open_source(source) as handle:
+        try:
+            reader = PdfReader(handle)
+            encrypted = reader.is_encrypted and not reader.decrypt("")
+            page_count = 0 if encrypted else len(reader.pages)
+        except PyPdfError as error:
+            raise ValueError("Malformed PDF") from error
+    return PdfInfo(page_count=page_count, encrypted=encrypted)
+
+
+def merge_pdfs(pdf_files: Iterable[InputSource], output_path: Path) -> None:
     writer = PdfWriter()
-    for pdf_bytes in pdf_files:
-        reader = PdfReader(BytesIO(pdf_bytes))
-        for page in reader.pages:
-            writer.add_page(page)
-    output = BytesIO()
-    writer.write(output)
-    return output.getvalue()
+    for source in pdf_files:
+        with open_source(source) as handle:
+            reader = PdfReader(handle)
+            if reader.is_encrypted:
+                reader.decrypt("")
+            for page in reader.pages:
+                writer.add_page(page)
+    with open(output_path, "wb") as output:
+        writer.write(output)
 
 
-def pdf_to_docx(pdf_bytes: bytes) -> bytes:
-    reader = PdfReader(BytesIO(pdf_bytes))
-    document = Document()
+def extract_text_chunk(source: InputSource, start: int, stop: int) -> List[str]:
+    with open_source(source) as handle:
+        reader = PdfReader(handle)
+        return [reader.pages[index].extract_text() or "" for index in range(start, stop)]
 
-    for page in reader.pages:
-        text = page.extract_text() or ""
+
+def build_docx(pages: Iterable[str], template: Optional[TemplatePath] = None) -> bytes:
+    document = new_document(template)
+    for text in pages:
         for line in text.splitlines():
             document.add_paragraph(line)
         document.add_page_break()
@@ -31,3 +62,63 @@ def pdf_to_docx(pdf_bytes: bytes) -> bytes:
     output = BytesIO()
     document.save(output)
     return output.getvalue()
+
+
+def pdf_to_docx(
+    source: InputSource,
+    page_range: Optional[PageRange] = None,
+    max_pages: Optional[int] = None,
+    template: Optional[TemplatePath] = None,
+) -> bytes:
+    with open_source(source) as handle:
+        reader = PdfReader(handle)
+        pages = resolve_page_range(len(reader.pages), page_range, max_pages)
+        texts = [reader.pages[index].extract_text() or "" for index in pages]
+    return build_docx(texts, template)
+
+
+def _recompress_image(image_file: ImageFile, max_pixels: float, quality: int) -> None:
+    xobject = image_file.indirect_reference.get_object()
+    if "/SMask" in xobject or "/Mask" in xobject:
+        return
+    image = image_file.image
+    if image is None or image.mode not in RECOMPRESS_MODES:
+        return
+    image = image.convert("L" if image.mode == "L" else "RGB")
+    if max(image.size) > max_pixels:
+        image.thumbnail((int(max_pixels), int(max_pixels)), Image.LANCZOS, reducing_gap=3.0)
+    encoded = BytesIO()
+    image.save(encoded, "JPEG", quality=quality)
+    if encoded.tell() >= len(image_file.data):
+        return
+    image_file.replace(image, quality=quality)
+
+
+def compress_pdf(
+    source: InputSource,
+    output_path: Path,
+    max_dpi: int = COMPRESS_DPI,
+    quality: int = COMPRESS_QUALITY,
+) -> None:
+    with open_source(source) as handle:
+        try:
+            reader = PdfReader(handle)
+            if reader.is_encrypted and not reader.decrypt(""):
+                raise ValueError("Encrypted PDF")
+            writer = PdfWriter(clone_from=reader)
+            recompressed = set()
+            for page in writer.pages:
+                # No image needs more pixels than covering the whole page at max_dpi.
+                max_pixels = max(float(page.mediabox.width), float(page.mediabox.height)) / 72 * max_dpi
+                for image_file in page.images:
+                    reference = image_file.indirect_reference
+                    if reference is None or reference.idnum in recompressed:
+                        continue
+                    recompressed.add(reference.idnum)
+                    _recompress_image(image_file, max_pixels, quality)
+                page.compress_content_streams()
+            writer.compress_identical_objects()
+        except PyPdfError as error:
+            raise ValueError("Malformed PDF") from error
+        with open(output_path, "wb") as output:
+            writer.write(output)
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import copy
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterator, Optional, Union
+
+from docx.api import _default_docx_path
+from docx.document import Document as DocxDocument
+from docx.package import Package
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.platypus import Flowable
+
+TemplatePath = Union[str, Path]
+FLOWABLE_BATCH_SIZE = 64
+
+
+@lru_cache(maxsize=8)
+def _load_package(path: str) -> Package:
+    # Kept as a bare package: once a Document wraps it, deepcopy would split the
+    # wrapper's element from the part's element (lxml ignores the deepcopy memo).
+    return Package.open(path)
+
+
+def new_document(template: Optional[TemplatePath] = None) -> DocxDocument:
+    package = _load_package(str(template) if template else _default_docx_path())
+    return copy.deepcopy(package).main_document_part.document
+
+
+@lru_cache(maxsize=256)
+def paragraph_style(name: str, **attributes: Any) -> ParagraphStyle:
+    return ParagraphStyle(name=name, **attributes)
+
+
+class FlowableStream(list):
+    # doc.build() consumes flowables from the front of a list. Refilling the list
+    # from a generator keeps only a small window of flowables alive at a time.
+    def __init__(self, source: Iterator[Flowable], batch_size: int = FLOWABLE_BATCH_SIZE) -> None:
+        super().__init__()
+        self._source: Optional[Iterator[Flowable]] = source
+        self._batch_size = batch_size
+
+    def _fill(self) -> None:
+        while self._source is not None and super().__len__() < self._batch_size:
+            flowable = next(self._source, None)
+            if flowable is None:
+                self._source = None
+                return
+            self.append(flowable)
+
+    def __len__(self) -> int:
+        self._fill()
+        return super().__len__()
+
+    def __getitem__(self, index):
+        self._fill()
+        return super().__getitem__(index)
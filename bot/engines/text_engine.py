@@ -1,16 +1,19 @@
 from __future__ import annotations
 
+import copy
 from io import BytesIO
-from typing import Tuple
+from typing import Iterator, Optional, Tuple
+from xml.sax.saxutils import escape
 
-from docx import Document
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.shared import Pt
+from docx.text.paragraph import Paragraph as DocxParagraph
 from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY, TA_LEFT, TA_RIGHT
 from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import ParagraphStyle
-from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+from reportlab.platypus import Flowable, Paragraph, SimpleDocTemplate, Spacer
 
+from bot.engines.fonts import FontSet, register_fonts
+from bot.engines.templates import FlowableStream, TemplatePath, new_document, paragraph_style
 from bot.models.documents import TextAlignment, TextStyle
 
 
@@ -28,14 +31,46 @@ PDF_ALIGNMENT_MAP = {
     TextAlignment.JUSTIFY: TA_JUSTIFY,
 }
 
+# Laying out one Paragraph re-wraps its remaining text on every page it spans,
+# so a single huge paragraph costs quadratic time. Longer lines are split at a
+# space into paragraphs of about this size.
+MAX_PARAGRAPH_CHARS = 10_000
+
 
 def _apply_style(run, style: TextStyle) -> None:
     run.bold = style in {TextStyle.BOLD, TextStyle.BOLD_ITALIC}
     run.italic = style in {TextStyle.ITALIC, TextStyle.BOLD_ITALIC}
 
 
-def text_to_docx(title: str, body: str, alignment: TextAlignment, style: TextStyle, font_size: int) -> bytes:
-    document = Document()
+def _lines(body: str) -> Iterator[str]:
+    start = 0
+    while start <= len(body):
+        end = body.find("\n", start)
+        if end == -1:
+            end = len(body)
+        yield body[start:end].rstrip("\r")
+        start = end + 1
+
+
+def _chunks(line: str) -> Iterator[str]:
+    while len(line) > MAX_PARAGRAPH_CHARS:
+        cut = line.rfind(" ", 0, MAX_PARAGRAPH_CHARS)
+        if cut <= 0:
+            cut = MAX_PARAGRAPH_CHARS
+        yield line[:cut]
+        line = line[cut:].lstrip(" ")
+    yield line
+
+
+def text_to_docx(
+    title: str,
+    body: str,
+    alignment: TextAlignment,
+    style: TextStyle,
+    font_size: int,
+    template: Optional[TemplatePath] = None,
+) -> bytes:
+    document = new_document(template)
     title_paragraph = document.add_paragraph()
     title_run = title_paragraph.add_run(title)
     title_run.bold = True
@@ -43,39 +78,65 @@ def text_to_docx(title: str, body: str, alignment: TextAlignment, style: TextSty
     title_paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
 
     document.add_paragraph("")
-    paragraph = document.add_paragraph()
-    paragraph.alignment = ALIGNMENT_MAP[alignment]
-    run = paragraph.add_run(body)
+    # One Word paragraph per line. Body paragraphs are cloned from a styled
+    # prototype and chained with addnext(): add_paragraph() looks up the section
+    # properties on every call, which is quadratic over many lines.
+    prototype = document.add_paragraph()
+    prototype.alignment = ALIGNMENT_MAP[alignment]
+    prototype.paragraph_format.space_before = Pt(0)
+    prototype.paragraph_format.space_after = Pt(0)
+    run = prototype.add_run()
     _apply_style(run, style)
     run.font.size = Pt(font_size)
+    line_template = copy.deepcopy(prototype._p)
+
+    previous = prototype._p
+    for index, line in enumerate(_lines(body)):
+        if index == 0:
+            run.text = line
+            continue
+        element = copy.deepcopy(line_template)
+        previous.addnext(element)
+        DocxParagraph(element, prototype._parent).runs[0].text = line
+        previous = element
 
     stream = BytesIO()
     document.save(stream)
     return stream.getvalue()
 
 
-def text_to_pdf(title: str, body: str, alignment: TextAlignment, style: TextStyle, font_size: int) -> bytes:
+def text_to_pdf(
+    title: str,
+    body: str,
+    alignment: TextAlignment,
+    style: TextStyle,
+    font_size: int,
+    fonts: Optional[FontSet] = None,
+) -> bytes:
+    fonts = fonts or register_fonts()
     buffer = BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=A4)
-    alignment_value = PDF_ALIGNMENT_MAP[alignment]
-
-    base_style = ParagraphStyle(
-        name="Body",
+    base_style = paragraph_style(
+        "Body",
+        fontName=fonts.for_style(style),
         fontSize=font_size,
         leading=font_size * 1.4,
-        alignment=alignment_value,
+        alignment=PDF_ALIGNMENT_MAP[alignment],
     )
-    if style in {TextStyle.BOLD, TextStyle.BOLD_ITALIC}:
-        base_style.fontName = "Helvetica-Bold"
-    if style in {TextStyle.ITALIC, TextStyle.BOLD_ITALIC}:
-        base_style.fontName = "Helvetica-Oblique" if style == TextStyle.ITALIC else "Helvetica-BoldOblique"
-
-    elements = [
-        Paragraph(f"<b>{title}</b>", ParagraphStyle(name="Title", fontSize=font_size + 2, alignment=TA_CENTER)),
-        Spacer(1, font_size),
-        Paragraph(body.replace("\n", "<br />"), base_style),
-    ]
-    doc.build(elements)
+
+    title_style = paragraph_style("Title", fontName=fonts.regular, fontSize=font_size + 2, alignment=TA_CENTER)
+
+    def flowables() -> Iterator[Flowable]:
+        yield Paragraph(f"<b>{escape(title)}</b>", title_style)
+        yield Spacer(1, font_size)
+        for line in _lines(body):
+            if not line.strip():
+                yield Spacer(1, base_style.leading)
+                continue
+            for chunk in _chunks(line):
+                yield Paragraph(escape(chunk), base_style)
+
+    doc.build(FlowableStream(flowables()))
     return buffer.getvalue()
 
 
@@ -86,9 +147,11 @@ def build_text_document(
     style: TextStyle,
     font_size: int,
     output_format: str,
+    template: Optional[TemplatePath] = None,
+    fonts: Optional[FontSet] = None,
 ) -> Tuple[bytes, str]:
     if output_format == "docx":
-        return text_to_docx(title, body, alignment, style, font_size), "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+        return text_to_docx(title, body, alignment, style, font_size, template), "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
     if output_format == "pdf":
-        return text_to_pdf(title, body, alignment, style, font_size), "application/pdf"
+        return text_to_pdf(title, body, alignment, style, font_size, fonts), "application/pdf"
     raise ValueError("Unsupported output format")
@@ -1,20 +1,57 @@
 from __future__ import annotations
 
+import asyncio
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from weakref import WeakValueDictionary
+
 from aiogram import F, Router
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
-from aiogram.types import CallbackQuery, Message, BufferedInputFile
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.types import CallbackQuery, Message
 
+from bot.core.cache import ConversionCache
 from bot.core.config import AppConfig
 from bot.core.storage import UserSettingsStore
 from bot.i18n import t
-from bot.models.documents import TextAlignment, TextStyle
-from bot.services.document_service import DocumentService
-from bot.utils.keyboards import alignment_keyboard, done_keyboard, menu_keyboard, size_keyboard, style_keyboard
-from bot.utils.telegram import download_document, download_photo, extract_photo
-from bot.utils.validators import is_mime_valid, is_size_valid
+from bot.models.documents import (
+    ConversionTimeoutError,
+    ImageQuality,
+    PageLimitError,
+    PageRange,
+    PageRangeError,
+    PdfInfo,
+    TextAlignment,
+    TextStyle,
+)
+from bot.services.document_service import AsyncDocumentService
+from bot.services.jobs import JobQueue
+from bot.utils.files import TempFile, cleanup_files, cleanup_session_files
+from bot.utils.keyboards import (
+    alignment_keyboard,
+    done_keyboard,
+    menu_keyboard,
+    page_range_keyboard,
+    passport_output_keyboard,
+    quality_keyboard,
+    size_keyboard,
+    style_keyboard,
+)
+from bot.utils.telegram import (
+    download_document,
+    download_file,
+    download_photo,
+    download_photos,
+    extract_photo,
+    result_caption,
+    send_generated,
+)
+from bot.utils.validators import ContentRules, InvalidFileError, is_mime_valid, is_size_valid, parse_page_range
 
 router = Router()
+IMAGE_FORMATS = ("jpeg", "png")
+_session_locks: "WeakValueDictionary[StorageKey, asyncio.Lock]" = WeakValueDictionary()
 
 
 class TextStates(StatesGroup):
@@ -25,8 +62,12 @@ class TextStates(StatesGroup):
     waiting_body = State()
 
 
+QUALITY_CALLBACKS = {f"quality:{quality.value}" for quality in ImageQuality}
+
+
 class ImagePdfStates(StatesGroup):
     waiting_title = State()
+    waiting_quality = State()
     collecting_images = State()
 
 
@@ -34,6 +75,10 @@ class ImagePassportStates(StatesGroup):
     waiting_image = State()
 
 
+class PassportBatchStates(StatesGroup):
+    collecting_images = State()
+
+
 class PdfMergeStates(StatesGroup):
     collecting_pdfs = State()
 
@@ -44,6 +89,119 @@ class DocxToPdfStates(StatesGroup):
 
 class PdfToDocxStates(StatesGroup):
     waiting_pdf = State()
+    waiting_range = State()
+
+
+class PdfCompressStates(StatesGroup):
+    waiting_pdf = State()
+
+
+async def _answer_cached(message: Message, cache: ConversionCache, key: str, language: str) -> bool:
+    file_id = cache.get_file_id(key)
+    if file_id is None:
+        return False
+    await message.answer_document(file_id, caption=t(language, "success"))
+    return True
+
+
+async def _convert(
+    message: Message,
+    language: str,
+    service: AsyncDocumentService,
+    queue: JobQueue | None,
+    operation: str,
+    payload: Dict[str, Any],
+    inputs: List[str],
+    cache: ConversionCache | None = None,
+    key: str | None = None,
+) -> None:
+    if queue is not None:
+        queue.submit(operation, payload, inputs, chat_id=message.chat.id, language=language, cache_key=key)
+        await message.answer(t(language, "queued"))
+        return
+    try:
+        document = await getattr(service, operation)(**payload)
+    except ConversionTimeoutError:
+        await message.answer(t(language, "timeout"))
+        return
+    finally:
+        cleanup_files(TempFile(path=Path(path)) for path in inputs)
+    caption = result_caption(language, document)
+    await send_generated(message.bot, message.chat.id, document, caption, cache, key, operation)
+
+
+def _content_rules(config: AppConfig, *formats: str, max_size_mb: Optional[int] = None) -> ContentRules:
+    return ContentRules(
+        formats=frozenset(formats),
+        max_bytes=(max_size_mb or config.bot.max_file_size_mb) * 1024 * 1024,
+        max_pixels=config.bot.max_image_pixels,
+        max_pages=config.bot.max_input_pages,
+    )
+
+
+async def _reject(message: Message, language: str, error: ValueError) -> None:
+    if isinstance(error, PageLimitError):
+        await message.answer(t(language, "too_many_pages", pages=str(error.page_count), limit=str(error.limit)))
+    else:
+        await message.answer(t(language, "invalid_file"))
+
+
+async def _append_session_files(
+    state: FSMContext,
+    key: str,
+    entries: List[Dict[str, Any]],
+    max_pages: Optional[int] = None,
+) -> None:
+    # Handlers for one user run concurrently; serialize the read-modify-write
+    # so files sent in quick succession are never lost. With max_pages set, the
+    # entries are refused with PageLimitError if their page_count would push
+    # the session total past it.
+    lock = _session_locks.setdefault(state.key, asyncio.Lock())
+    async with lock:
+        data = await state.get_data()
+        stored = data.get(key, [])
+        if max_pages is not None:
+            pages = sum(entry.get("page_count", 0) for entry in stored + entries)
+            if pages > max_pages:
+                raise PageLimitError(pages, max_pages)
+        await state.update_data({key: stored + entries})
+
+
+async def _collect_photos(
+    message: Message,
+    album: Optional[List[Message]],
+    state: FSMContext,
+    language: str,
+    config: AppConfig,
+    cache: ConversionCache,
+    operation: str,
+) -> None:
+    photos = []
+    for item in album or [message]:
+        photo = extract_photo(item.photo)
+        if not photo or not is_size_valid(photo.file_size or 0, config.bot.max_file_size_mb):
+            await message.answer(t(language, "invalid_file"))
+            continue
+        photos.append(photo)
+    if not photos:
+        return
+    try:
+        temp_files = await download_photos(
+            message.bot,
+            photos,
+            cache,
+            operation,
+            config.bot.download_concurrency,
+            _content_rules(config, *IMAGE_FORMATS),
+        )
+    except InvalidFileError as error:
+        await _reject(message, language, error)
+        return
+    entries = [
+        {"path": str(temp_file.path), "file_unique_id": photo.file_unique_id, "size": photo.file_size or 0}
+        for photo, temp_file in zip(photos, temp_files)
+    ]
+    await _append_session_files(state, "images", entries)
 
 
 @router.callback_query(F.data.startswith("action:"))
@@ -54,6 +212,8 @@ async def menu_actions(
 ) -> None:
     action = callback.data.split(":", 1)[1]
     language = settings.get(callback.from_user.id).language
+    cleanup_session_files(await state.get_data())
+    await state.set_data({})
 
     if action in {"text_docx", "text_pdf"}:
         await state.set_state(TextStates.waiting_title)
@@ -65,6 +225,12 @@ async def menu_actions(
     elif action == "image_passport":
         await state.set_state(ImagePassportStates.waiting_image)
         await callback.message.answer(t(language, "ask_passport_image"))
+    elif action == "passport_batch":
+        await state.set_state(PassportBatchStates.collecting_images)
+        await state.update_data(images=[])
+        await callback.message.answer(
+            t(language, "ask_passport_images"), reply_markup=passport_output_keyboard(language)
+        )
     elif action == "pdf_merge":
         await state.set_state(PdfMergeStates.collecting_pdfs)
         await state.update_data(pdfs=[])
@@ -75,6 +241,9 @@ async def menu_actions(
     elif action == "pdf_docx":
         await state.set_state(PdfToDocxStates.waiting_pdf)
         await callback.message.answer(t(language, "ask_pdf_file"))
+    elif action == "pdf_compress":
+        await state.set_state(PdfCompressStates.waiting_pdf)
+        await callback.message.answer(t(language, "ask_pdf_compress"))
 
     await callback.answer()
 
@@ -123,7 +292,8 @@ async def text_body(
     state: FSMContext,
     settings: UserSettingsStore,
     config: AppConfig,
-    service: DocumentService,
+    service: AsyncDocumentService,
+    queue: JobQueue | None,
 ) -> None:
     language = settings.get(message.from_user.id).language
     text = message.text
@@ -131,30 +301,46 @@ async def text_body(
     if message.document:
         if not is_mime_valid(message.document.mime_type, {"text/plain"}) or not is_size_valid(
             message.document.file_size or 0,
-            config.bot.max_file_size_mb,
+            config.bot.max_text_size_mb,
         ):
             await message.answer(t(language, "invalid_file"))
             return
-        text_bytes = await download_document(message.bot, message.document)
-        text = text_bytes.decode("utf-8", errors="ignore")
+        try:
+            temp_file = await download_document(
+                message.bot,
+                message.document,
+                operation="text_to_document",
+                rules=_content_rules(config, "text", max_size_mb=config.bot.max_text_size_mb),
+            )
+        except InvalidFileError as error:
+            await _reject(message, language, error)
+            return
+        try:
+            text = temp_file.path.read_text(encoding="utf-8", errors="ignore")
+        finally:
+            temp_file.cleanup()
 
     if not text:
         await message.answer(t(language, "error"))
         return
 
     data = await state.get_data()
-    document = service.text_to_document(
-        title=data["title"],
-        body=text,
-        alignment=TextAlignment(data["alignment"]),
-        style=TextStyle(data["style"]),
-        font_size=data["font_size"],
-        output_format=data["output_format"],
-    )
     await state.clear()
-    await message.answer_document(
-        BufferedInputFile(document.content, filename=document.filename), 
-        caption=t(language, "success")
+    await _convert(
+        message,
+        language,
+        service,
+        queue,
+        "text_to_document",
+        {
+            "title": data["title"],
+            "body": text,
+            "alignment": TextAlignment(data["alignment"]),
+            "style": TextStyle(data["style"]),
+            "font_size": data["font_size"],
+            "output_format": data["output_format"],
+        },
+        [],
     )
     await message.answer(t(language, "menu_title"), reply_markup=menu_keyboard(language))
 
@@ -166,31 +352,32 @@ async def image_pdf_title(message: Message, state: FSMContext, settings: UserSet
         title = None
     await state.update_data(title=title)
     language = settings.get(message.from_user.id).language
+    await state.set_state(ImagePdfStates.waiting_quality)
+    await message.answer(t(language, "ask_quality"), reply_markup=quality_keyboard(language))
+
+
+@router.callback_query(ImagePdfStates.waiting_quality, F.data.in_(QUALITY_CALLBACKS))
+async def image_pdf_quality(callback: CallbackQuery, state: FSMContext, settings: UserSettingsStore) -> None:
+    quality = callback.data.split(":", 1)[1]
+    await state.update_data(quality=quality)
+    language = settings.get(callback.from_user.id).language
     await state.set_state(ImagePdfStates.collecting_images)
     await state.update_data(images=[])
-    await message.answer(t(language, "ask_images"), reply_markup=done_keyboard(language))
+    await callback.message.answer(t(language, "ask_images"), reply_markup=done_keyboard(language))
+    await callback.answer()
 
 
-@router.message(ImagePdfStates.collecting_images)
+@router.message(ImagePdfStates.collecting_images, flags={"album": True})
 async def image_pdf_collect(
     message: Message,
     state: FSMContext,
     settings: UserSettingsStore,
     config: AppConfig,
+    cache: ConversionCache,
+    album: Optional[List[Message]] = None,
 ) -> None:
     language = settings.get(message.from_user.id).language
-    photo = extract_photo(message.photo)
-    if not photo:
-        await message.answer(t(language, "invalid_file"))
-        return
-    if not is_size_valid(photo.file_size or 0, config.bot.max_file_size_mb):
-        await message.answer(t(language, "invalid_file"))
-        return
-    image_bytes = await download_photo(message.bot, photo)
-    data = await state.get_data()
-    images = data.get("images", [])
-    images.append(image_bytes)
-    await state.update_data(images=images)
+    await _collect_photos(message, album, state, language, config, cache, "images_to_pdf")
 
 
 @router.callback_query(ImagePdfStates.collecting_images, F.data == "done")
@@ -198,7 +385,8 @@ async def image_pdf_done(
     callback: CallbackQuery,
     state: FSMContext,
     settings: UserSettingsStore,
-    service: DocumentService,
+    service: AsyncDocumentService,
+    queue: JobQueue | None,
 ) -> None:
     language = settings.get(callback.from_user.id).language
     data = await state.get_data()
@@ -206,11 +394,20 @@ async def image_pdf_done(
     if not images:
         await callback.message.answer(t(language, "no_files"))
         return
-    document = service.images_to_pdf(images, title=data.get("title"))
     await state.clear()
-    await callback.message.answer_document(
-        BufferedInputFile(document.content, filename=document.filename), 
-        caption=t(language, "success")
+    paths = [entry["path"] for entry in images]
+    await _convert(
+        callback.message,
+        language,
+        service,
+        queue,
+        "images_to_pdf",
+        {
+            "images": paths,
+            "title": data.get("title"),
+            "quality": ImageQuality(data.get("quality", ImageQuality.SCREEN)),
+        },
+        paths,
     )
     await callback.message.answer(t(language, "menu_title"), reply_markup=menu_keyboard(language))
     await callback.answer()
@@ -222,7 +419,9 @@ async def passport_image(
     state: FSMContext,
     settings: UserSettingsStore,
     config: AppConfig,
-    service: DocumentService,
+    service: AsyncDocumentService,
+    cache: ConversionCache,
+    queue: JobQueue | None,
 ) -> None:
     language = settings.get(message.from_user.id).language
     photo = extract_photo(message.photo)
@@ -232,35 +431,175 @@ async def passport_image(
     if not is_size_valid(photo.file_size or 0, config.bot.max_file_size_mb):
         await message.answer(t(language, "invalid_file"))
         return
-    image_bytes = await download_photo(message.bot, photo)
-    document = service.image_to_passport(image_bytes, as_pdf=False)
+    key = ConversionCache.make_key(photo.file_unique_id, "image_to_passport", as_pdf=False)
+    if not await _answer_cached(message, cache, key, language):
+        try:
+            temp_file = await download_photo(
+                message.bot,
+                photo,
+                cache,
+                operation="image_to_passport",
+                rules=_content_rules(config, *IMAGE_FORMATS),
+            )
+        except InvalidFileError as error:
+            await _reject(message, language, error)
+            return
+        path = str(temp_file.path)
+        await _convert(
+            message,
+            language,
+            service,
+            queue,
+            "image_to_passport",
+            {"image": path, "as_pdf": False},
+            [path],
+            cache,
+            key,
+        )
     await state.clear()
-    await message.answer_document(
-        BufferedInputFile(document.content, filename=document.filename), 
-        caption=t(language, "success")
-    )
     await message.answer(t(language, "menu_title"), reply_markup=menu_keyboard(language))
 
 
-@router.message(PdfMergeStates.collecting_pdfs)
-async def pdf_merge_collect(
+@router.message(PassportBatchStates.collecting_images, flags={"album": True})
+async def passport_batch_collect(
     message: Message,
     state: FSMContext,
     settings: UserSettingsStore,
     config: AppConfig,
+    cache: ConversionCache,
+    album: Optional[List[Message]] = None,
 ) -> None:
     language = settings.get(message.from_user.id).language
-    if not message.document or not is_mime_valid(message.document.mime_type, {"application/pdf"}):
-        await message.answer(t(language, "invalid_file"))
+    await _collect_photos(message, album, state, language, config, cache, "passport_batch")
+
+
+@router.callback_query(PassportBatchStates.collecting_images, F.data.in_({"passport:sheet", "passport:zip"}))
+async def passport_batch_done(
+    callback: CallbackQuery,
+    state: FSMContext,
+    settings: UserSettingsStore,
+    service: AsyncDocumentService,
+    queue: JobQueue | None,
+) -> None:
+    language = settings.get(callback.from_user.id).language
+    data = await state.get_data()
+    images = data.get("images", [])
+    if not images:
+        await callback.message.answer(t(language, "no_files"))
         return
-    if not is_size_valid(message.document.file_size or 0, config.bot.max_file_size_mb):
+    await state.clear()
+    paths = [entry["path"] for entry in images]
+    await _convert(
+        callback.message,
+        language,
+        service,
+        queue,
+        "passport_batch",
+        {"images": paths, "as_zip": callback.data == "passport:zip"},
+        paths,
+    )
+    await callback.message.answer(t(language, "menu_title"), reply_markup=menu_keyboard(language))
+    await callback.answer()
+
+
+async def _inspect_pdf(
+    message: Message,
+    language: str,
+    config: AppConfig,
+    service: AsyncDocumentService,
+    temp_file: TempFile,
+) -> Optional[PdfInfo]:
+    # Downloads only catch oversized linearized PDFs from their header; every
+    # other PDF is held to the page budget here, before any real work. The
+    # file is removed when it is rejected.
+    try:
+        info = await service.inspect_pdf(str(temp_file.path))
+    except ValueError:
+        info = None
+    except ConversionTimeoutError:
+        temp_file.cleanup()
+        await message.answer(t(language, "timeout"))
+        return None
+    if info is None or info.encrypted:
+        temp_file.cleanup()
+        await message.answer(t(language, "pdf_encrypted" if info else "invalid_file"))
+        return None
+    if info.page_count > config.bot.max_input_pages:
+        temp_file.cleanup()
+        await _reject(message, language, PageLimitError(info.page_count, config.bot.max_input_pages))
+        return None
+    return info
+
+
+async def _collect_pdf(
+    message: Message,
+    item: Message,
+    language: str,
+    config: AppConfig,
+    service: AsyncDocumentService,
+    cache: ConversionCache,
+) -> Optional[Dict[str, Any]]:
+    document = item.document
+    if not document or not is_mime_valid(document.mime_type, {"application/pdf"}):
+        await message.answer(t(language, "invalid_file"))
+        return None
+    if not is_size_valid(document.file_size or 0, config.bot.max_file_size_mb):
         await message.answer(t(language, "invalid_file"))
+        return None
+    try:
+        temp_file = await download_document(
+            message.bot,
+            document,
+            cache,
+            operation="merge_pdfs",
+            rules=_content_rules(config, "pdf"),
+        )
+    except (InvalidFileError, PageLimitError) as error:
+        await _reject(message, language, error)
+        return None
+    info = await _inspect_pdf(message, language, config, service, temp_file)
+    if info is None:
+        return None
+    return {
+        "path": str(temp_file.path),
+        "file_unique_id": document.file_unique_id,
+        "size": document.file_size or 0,
+        "page_count": info.page_count,
+    }
+
+
+@router.message(PdfMergeStates.collecting_pdfs, flags={"album": True})
+async def pdf_merge_collect(
+    message: Message,
+    state: FSMContext,
+    settings: UserSettingsStore,
+    config: AppConfig,
+    service: AsyncDocumentService,
+    cache: ConversionCache,
+    album: Optional[List[Message]] = None,
+) -> None:
+    language = settings.get(message.from_user.id).language
+    semaphore = asyncio.Semaphore(config.bot.download_concurrency)
+
+    async def collect(item: Message) -> Optional[Dict[str, Any]]:
+        async with semaphore:
+            return await _collect_pdf(message, item, language, config, service, cache)
+
+    results = await asyncio.gather(*(collect(item) for item in album or [message]), return_exceptions=True)
+    entries = [result for result in results if isinstance(result, dict)]
+    errors = [result for result in results if isinstance(result, BaseException)]
+    if errors:
+        cleanup_files(TempFile(path=Path(entry["path"])) for entry in entries)
+        raise errors[0]
+    if not entries:
         return
-    pdf_bytes = await download_document(message.bot, message.document)
-    data = await state.get_data()
-    pdfs = data.get("pdfs", [])
-    pdfs.append(pdf_bytes)
-    await state.update_data(pdfs=pdfs)
+    # Merging holds every page object in memory at once, so the whole session
+    # shares one page budget rather than each file getting its own.
+    try:
+        await _append_session_files(state, "pdfs", entries, max_pages=config.bot.max_input_pages)
+    except PageLimitError as error:
+        cleanup_files(TempFile(path=Path(entry["path"])) for entry in entries)
+        await _reject(message, language, error)
 
 
 @router.callback_query(PdfMergeStates.collecting_pdfs, F.data == "done")
@@ -268,7 +607,8 @@ async def pdf_merge_done(
     callback: CallbackQuery,
     state: FSMContext,
     settings: UserSettingsStore,
-    service: DocumentService,
+    service: AsyncDocumentService,
+    queue: JobQueue | None,
 ) -> None:
     language = settings.get(callback.from_user.id).language
     data = await state.get_data()
@@ -276,12 +616,9 @@ async def pdf_merge_done(
     if not pdfs:
         await callback.message.answer(t(language, "no_files"))
         return
-    document = service.merge_pdfs(pdfs)
     await state.clear()
-    await callback.message.answer_document(
-        BufferedInputFile(document.content, filename=document.filename), 
-        caption=t(language, "success")
-    )
+    paths = [entry["path"] for entry in pdfs]
+    await _convert(callback.message, language, service, queue, "merge_pdfs", {"pdf_files": paths}, paths)
     await callback.message.answer(t(language, "menu_title"), reply_markup=menu_keyboard(language))
     await callback.answer()
 
@@ -292,7 +629,9 @@ async def docx_to_pdf_handler(
     state: FSMContext,
     settings: UserSettingsStore,
     config: AppConfig,
-    service: DocumentService,
+    service: AsyncDocumentService,
+    cache: ConversionCache,
+    queue: JobQueue | None,
 ) -> None:
     language = settings.get(message.from_user.id).language
     if not message.document or not is_mime_valid(
@@ -304,13 +643,32 @@ async def docx_to_pdf_handler(
     if not is_size_valid(message.document.file_size or 0, config.bot.max_file_size_mb):
         await message.answer(t(language, "invalid_file"))
         return
-    docx_bytes = await download_document(message.bot, message.document)
-    document = service.docx_to_pdf(docx_bytes, title=None)
+    key = ConversionCache.make_key(message.document.file_unique_id, "docx_to_pdf", title=None)
+    if not await _answer_cached(message, cache, key, language):
+        try:
+            temp_file = await download_document(
+                message.bot,
+                message.document,
+                cache,
+                operation="docx_to_pdf",
+                rules=_content_rules(config, "zip"),
+            )
+        except InvalidFileError as error:
+            await _reject(message, language, error)
+            return
+        path = str(temp_file.path)
+        await _convert(
+            message,
+            language,
+            service,
+            queue,
+            "docx_to_pdf",
+            {"docx_file": path, "title": None},
+            [path],
+            cache,
+            key,
+        )
     await state.clear()
-    await message.answer_document(
-        BufferedInputFile(document.content, filename=document.filename), 
-        caption=t(language, "success")
-    )
     await message.answer(t(language, "menu_title"), reply_markup=menu_keyboard(language))
 
 
@@ -320,7 +678,6 @@ async def pdf_to_docx_handler(
     state: FSMContext,
     settings: UserSettingsStore,
     config: AppConfig,
-    service: DocumentService,
 ) -> None:
     language = settings.get(message.from_user.id).language
     if not message.document or not is_mime_valid(message.document.mime_type, {"application/pdf"}):
@@ -329,11 +686,135 @@ async def pdf_to_docx_handler(
     if not is_size_valid(message.document.file_size or 0, config.bot.max_file_size_mb):
         await message.answer(t(language, "invalid_file"))
         return
-    pdf_bytes = await download_document(message.bot, message.document)
-    document = service.pdf_to_docx(pdf_bytes)
-    await state.clear()
-    await message.answer_document(
-        BufferedInputFile(document.content, filename=document.filename), 
-        caption=t(language, "success")
+    await state.update_data(
+        pdf={"file_id": message.document.file_id, "file_unique_id": message.document.file_unique_id}
     )
+    await state.set_state(PdfToDocxStates.waiting_range)
+    await message.answer(t(language, "ask_page_range"), reply_markup=page_range_keyboard(language))
+
+
+async def _convert_pdf_to_docx(
+    message: Message,
+    state: FSMContext,
+    language: str,
+    config: AppConfig,
+    service: AsyncDocumentService,
+    cache: ConversionCache,
+    queue: JobQueue | None,
+    page_range: PageRange | None,
+) -> None:
+    pdf = (await state.get_data())["pdf"]
+    key = ConversionCache.make_key(pdf["file_unique_id"], "pdf_to_docx", page_range=page_range)
+    if not await _answer_cached(message, cache, key, language):
+        try:
+            temp_file = await download_file(
+                message.bot,
+                pdf["file_id"],
+                pdf["file_unique_id"],
+                ".pdf",
+                cache,
+                operation="pdf_to_docx",
+                rules=_content_rules(config, "pdf"),
+            )
+        except (InvalidFileError, PageLimitError) as error:
+            # Another page range will not help with this file; start over.
+            await _reject(message, language, error)
+            await state.clear()
+            await message.answer(t(language, "menu_title"), reply_markup=menu_keyboard(language))
+            return
+        path = str(temp_file.path)
+        try:
+            await _convert(
+                message,
+                language,
+                service,
+                queue,
+                "pdf_to_docx",
+                {"pdf_file": path, "page_range": page_range},
+                [path],
+                cache,
+                key,
+            )
+        except PageLimitError as error:
+            await message.answer(t(language, "too_many_pages", pages=str(error.page_count), limit=str(error.limit)))
+            return
+        except PageRangeError:
+            await message.answer(t(language, "invalid_page_range"))
+            return
+    await state.clear()
+    await message.answer(t(language, "menu_title"), reply_markup=menu_keyboard(language))
+
+
+@router.message(PdfToDocxStates.waiting_range)
+async def pdf_to_docx_range(
+    message: Message,
+    state: FSMContext,
+    settings: UserSettingsStore,
+    config: AppConfig,
+    service: AsyncDocumentService,
+    cache: ConversionCache,
+    queue: JobQueue | None,
+) -> None:
+    language = settings.get(message.from_user.id).language
+    page_range = parse_page_range(message.text)
+    if page_range is None:
+        await message.answer(t(language, "invalid_page_range"), reply_markup=page_range_keyboard(language))
+        return
+    await _convert_pdf_to_docx(message, state, language, config, service, cache, queue, page_range)
+
+
+@router.callback_query(PdfToDocxStates.waiting_range, F.data == "pages:all")
+async def pdf_to_docx_all_pages(
+    callback: CallbackQuery,
+    state: FSMContext,
+    settings: UserSettingsStore,
+    config: AppConfig,
+    service: AsyncDocumentService,
+    cache: ConversionCache,
+    queue: JobQueue | None,
+) -> None:
+    language = settings.get(callback.from_user.id).language
+    await _convert_pdf_to_docx(callback.message, state, language, config, service, cache, queue, None)
+    await callback.answer()
+
+
+@router.message(PdfCompressStates.waiting_pdf)
+async def pdf_compress_handler(
+    message: Message,
+    state: FSMContext,
+    settings: UserSettingsStore,
+    config: AppConfig,
+    service: AsyncDocumentService,
+    cache: ConversionCache,
+    queue: JobQueue | None,
+) -> None:
+    language = settings.get(message.from_user.id).language
+    if not message.document or not is_mime_valid(message.document.mime_type, {"application/pdf"}):
+        await message.answer(t(language, "invalid_file"))
+        return
+    if not is_size_valid(message.document.file_size or 0, config.bot.max_file_size_mb):
+        await message.answer(t(language, "invalid_file"))
+        return
+    key = ConversionCache.make_key(message.document.file_unique_id, "compress_pdf")
+    if not await _answer_cached(message, cache, key, language):
+        try:
+            temp_file = await download_document(
+                message.bot,
+                message.document,
+                cache,
+                operation="compress_pdf",
+                rules=_content_rules(config, "pdf"),
+            )
+        except (InvalidFileError, PageLimitError) as error:
+            await _reject(message, language, error)
+            return
+        if await _inspect_pdf(message, language, config, service, temp_file) is None:
+            return
+        path = str(temp_file.path)
+        try:
+            await _convert(message, language, service, queue, "compress_pdf", {"pdf_file": path}, [path], cache, key)
+        except ValueError:
+            await message.answer(t(language, "invalid_file"))
+            return
+    await state.clear()
     await message.answer(t(language, "menu_title"), reply_markup=menu_keyboard(language))
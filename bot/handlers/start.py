@@ -6,6 +6,7 @@ from aiogram.types import CallbackQuery, Message
 
 from bot.core.storage import UserSettingsStore
 from bot.i18n import t
+from bot.utils.files import cleanup_session_files
 from bot.utils.keyboards import language_keyboard, menu_keyboard
 
 router = Router()
@@ -13,6 +14,7 @@ router = Router()
 
 @router.message(F.text == "/start")
 async def start_handler(message: Message, state: FSMContext, settings: UserSettingsStore) -> None:
+    cleanup_session_files(await state.get_data())
     await state.clear()
     await message.answer(t("ru", "start"), reply_markup=language_keyboard())
 
@@ -21,6 +23,7 @@ async def start_handler(message: Message, state: FSMContext, settings: UserSetti
 async def set_language(callback: CallbackQuery, state: FSMContext, settings: UserSettingsStore) -> None:
     language = callback.data.split(":", 1)[1]
     settings.set_language(callback.from_user.id, language)
+    cleanup_session_files(await state.get_data())
     await state.clear()
     await callback.message.answer(t(language, "language_set").format(language=t(language, "language_name")))
     await callback.message.answer(t(language, "menu_title"), reply_markup=menu_keyboard(language))
@@ -7,19 +7,25 @@ MESSAGES = {
     "menu_text_to_pdf": "Текст → PDF",
     "menu_image_to_pdf": "Изображения → PDF",
     "menu_image_to_passport": "Фото → 3x4",
+    "menu_passport_batch": "Фото → лист 3x4",
     "menu_pdf_merge": "Слияние PDF",
     "menu_docx_to_pdf": "DOCX → PDF",
     "menu_pdf_to_docx": "PDF → DOCX",
+    "menu_pdf_compress": "Сжать PDF",
     "ask_title": "Введите заголовок документа:",
     "ask_alignment": "Выберите выравнивание текста:",
     "ask_style": "Выберите стиль текста:",
     "ask_font_size": "Выберите размер шрифта:",
     "ask_text": "Отправьте текст сообщением или файлом TXT:",
+    "ask_quality": "Выберите качество изображений в PDF:",
     "ask_images": "Отправьте одно или несколько изображений. Когда закончите, нажмите «Готово».",
     "ask_passport_image": "Отправьте фото для формата 3x4:",
+    "ask_passport_images": "Отправьте одно или несколько фото для 3x4, затем выберите формат результата.",
     "ask_pdf_files": "Отправьте PDF файлы по очереди. Когда закончите, нажмите «Готово».",
     "ask_docx_file": "Отправьте DOCX файл:",
     "ask_pdf_file": "Отправьте PDF файл:",
+    "ask_pdf_compress": "Отправьте PDF файл для сжатия:",
+    "ask_page_range": "Укажите диапазон страниц (например, 1-10) или нажмите «Все страницы»:",
     "button_done": "Готово",
     "button_left": "По левому краю",
     "button_center": "По центру",
@@ -32,10 +38,23 @@ MESSAGES = {
     "button_size_12": "12",
     "button_size_14": "14",
     "button_size_16": "16",
+    "button_all_pages": "Все страницы",
+    "button_quality_screen": "Для экрана (меньше размер)",
+    "button_quality_print": "Для печати",
+    "button_quality_original": "Оригинал",
+    "button_passport_sheet": "Лист A4 для печати (PDF)",
+    "button_passport_zip": "Архив ZIP",
     "processing": "Обрабатываю файл...",
+    "queued": "Задача поставлена в очередь. Результат придет отдельным сообщением.",
     "success": "Готово! Вот ваш файл.",
+    "compressed": "Готово! Размер: {before} МБ → {after} МБ (−{saved}%).",
+    "timeout": "Обработка файла заняла слишком много времени и была остановлена. Попробуйте другой файл.",
     "error": "Произошла ошибка. Попробуйте еще раз.",
     "invalid_file": "Неверный тип файла или превышен лимит размера.",
     "no_files": "Файлы не получены. Попробуйте еще раз.",
+    "invalid_page_range": "Неверный диапазон страниц. Попробуйте еще раз.",
+    "too_many_pages": "Слишком много страниц: {pages}. Максимум — {limit}.",
+    "pdf_encrypted": "PDF защищен паролем и не может быть обработан.",
     "cancelled": "Операция отменена.",
+    "rate_limited": "Слишком много запросов. Подождите немного и попробуйте снова.",
 }
@@ -7,19 +7,25 @@ MESSAGES = {
     "menu_text_to_pdf": "Matn → PDF",
     "menu_image_to_pdf": "Rasm(lar) → PDF",
     "menu_image_to_passport": "Foto → 3x4",
+    "menu_passport_batch": "Foto → 3x4 varaq",
     "menu_pdf_merge": "PDF birlashtirish",
     "menu_docx_to_pdf": "DOCX → PDF",
     "menu_pdf_to_docx": "PDF → DOCX",
+    "menu_pdf_compress": "PDF ni siqish",
     "ask_title": "Hujjat sarlavhasini kiriting:",
     "ask_alignment": "Matn tekislashini tanlang:",
     "ask_style": "Matn uslubini tanlang:",
     "ask_font_size": "Shrift o‘lchamini tanlang:",
     "ask_text": "Matnni xabar yoki TXT fayl sifatida yuboring:",
+    "ask_quality": "PDF dagi rasmlar sifatini tanlang:",
     "ask_images": "Bir yoki bir nechta rasm yuboring. Tugatgach «Tayyor» ni bosing.",
     "ask_passport_image": "3x4 format uchun foto yuboring:",
+    "ask_passport_images": "3x4 uchun bir yoki bir nechta foto yuboring, so‘ng natija formatini tanlang.",
     "ask_pdf_files": "PDF fayllarni ketma-ket yuboring. Tugatgach «Tayyor» ni bosing.",
     "ask_docx_file": "DOCX fayl yuboring:",
     "ask_pdf_file": "PDF fayl yuboring:",
+    "ask_pdf_compress": "Siqish uchun PDF fayl yuboring:",
+    "ask_page_range": "Sahifalar oralig‘ini kiriting (masalan, 1-10) yoki «Barcha sahifalar» ni bosing:",
     "button_done": "Tayyor",
     "button_left": "Chapga",
     "button_center": "Markaz",
@@ -32,10 +38,23 @@ MESSAGES = {
     "button_size_12": "12",
     "button_size_14": "14",
     "button_size_16": "16",
+    "button_quality_screen": "Ekran uchun (kichik hajm)",
+    "button_quality_print": "Chop etish uchun",
+    "button_quality_original": "Asl sifat",
+    "button_all_pages": "Barcha sahifalar",
+    "button_passport_sheet": "Chop etish uchun A4 varaq (PDF)",
+    "button_passport_zip": "ZIP arxiv",
     "processing": "Fayl qayta ishlanmoqda...",
+    "queued": "Vazifa navbatga qo‘yildi. Natija alohida xabar bilan keladi.",
     "success": "Tayyor! Faylingiz.",
+    "compressed": "Tayyor! Hajmi: {before} MB → {after} MB (−{saved}%).",
+    "timeout": "Faylni qayta ishlash juda uzoq davom etdi va to‘xtatildi. Boshqa fayl bilan urinib ko‘ring.",
     "error": "Xatolik yuz berdi. Qayta urinib ko‘ring.",
     "invalid_file": "Fayl turi noto‘g‘ri yoki hajm limiti oshgan.",
     "no_files": "Fayllar olinmadi. Qayta urinib ko‘ring.",
+    "invalid_page_range": "Sahifalar oralig‘i noto‘g‘ri. Qayta urinib ko‘ring.",
+    "too_many_pages": "Sahifalar juda ko‘p: {pages}. Maksimum — {limit}.",
+    "pdf_encrypted": "PDF parol bilan himoyalangan, uni qayta ishlab bo‘lmaydi.",
     "cancelled": "Amal bekor qilindi.",
+    "rate_limited": "So‘rovlar juda ko‘p. Biroz kuting va qayta urinib ko‘ring.",
 }
@@ -2,7 +2,9 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from enum import Enum
-from typing import Optional
+from typing import Optional, Tuple
+
+PageRange = Tuple[int, int]
 
 
 class TextAlignment(str, Enum):
@@ -19,6 +21,12 @@ class TextStyle(str, Enum):
     BOLD_ITALIC = "bold_italic"
 
 
+class ImageQuality(str, Enum):
+    SCREEN = "screen"
+    PRINT = "print"
+    ORIGINAL = "original"
+
+
 @dataclass
 class TextDocumentOptions:
     title: str
@@ -28,3 +36,44 @@ class TextDocumentOptions:
     body: str
     output_format: str
     output_title: Optional[str] = None
+
+
+class PageRangeError(ValueError):
+    pass
+
+
+class PageLimitError(ValueError):
+    def __init__(self, page_count: int, limit: int) -> None:
+        super().__init__(page_count, limit)
+        self.page_count = page_count
+        self.limit = limit
+
+
+class ConversionTimeoutError(Exception):
+    def __init__(self, deadline: Optional[float]) -> None:
+        super().__init__(deadline)
+        self.deadline = deadline
+
+
+def resolve_page_range(page_count: int, page_range: Optional[PageRange], max_pages: Optional[int]) -> range:
+    start, end = page_range or (1, page_count)
+    if start < 1 or start > end or start > page_count:
+        raise PageRangeError(start, end)
+    pages = range(start - 1, min(end, page_count))
+    if max_pages is not None and len(pages) > max_pages:
+        raise PageLimitError(len(pages), max_pages)
+    return pages
+
+
+@dataclass(frozen=True)
+class PdfInfo:
+    page_count: int
+    encrypted: bool
+
+
+@dataclass(frozen=True)
+class PreparedImage:
+    path: str
+    width: int
+    height: int
+    temporary: bool
@@ -1,13 +1,34 @@
 from __future__ import annotations
 
+import asyncio
+import importlib
+import logging
+import math
+import os
+import shutil
+from contextvars import ContextVar
 from dataclasses import dataclass
-from typing import Iterable, Optional, Tuple
+from functools import partial, wraps
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, TypeVar
 
-from bot.engines.docx_engine import docx_to_pdf
-from bot.engines.image_engine import image_to_passport, images_to_pdf
-from bot.engines.pdf_engine import merge_pdfs, pdf_to_docx
-from bot.engines.text_engine import build_text_document
-from bot.models.documents import TextAlignment, TextStyle
+from bot.core.metrics import OUTPUT_BYTES, TIMEOUTS, track_phase
+from bot.models.documents import (
+    ConversionTimeoutError,
+    ImageQuality,
+    PageLimitError,
+    PageRange,
+    PdfInfo,
+    PreparedImage,
+    TextAlignment,
+    TextStyle,
+    resolve_page_range,
+)
+from bot.services.pool import WorkerPool
+from bot.utils.files import InputSource, TempFile, cleanup_files, create_temp_file
+
+if TYPE_CHECKING:
+    from bot.engines.fonts import FontSet
 
 
 @dataclass
@@ -15,9 +36,64 @@ class GeneratedFile:
     content: bytes
     filename: str
     mime_type: str
+    path: Optional[Path] = None
+    original_size: Optional[int] = None
+
+
+DOCX_MIME_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+PAGE_CHUNK_SIZE = 25
+
+# Seconds a single DocumentService call may run in a worker before the worker is
+# killed. Methods not listed get the service-wide default; None means no limit.
+# A deadline set for a public operation (pdf_to_docx, images_to_pdf, ...) applies
+# to every worker call that operation makes, ahead of the sub-step's own entry.
+DEFAULT_DEADLINE = 120.0
+DEADLINES: Dict[str, Optional[float]] = {
+    "warm_up": None,
+    "inspect_pdf": 30.0,
+    "prepare_image": 30.0,
+    "prepare_passport": 30.0,
+    "extract_text_chunk": 60.0,
+}
+
+# Engines pull in reportlab, python-docx, Pillow and pypdf. They are imported on
+# first use, normally inside the worker processes, so the bot process starts
+# without them.
+ENGINE_MODULES = (
+    "bot.engines.text_engine",
+    "bot.engines.image_engine",
+    "bot.engines.pdf_engine",
+    "bot.engines.docx_engine",
+)
+
+
+def load_engines() -> None:
+    for module in ENGINE_MODULES:
+        importlib.import_module(module)
 
 
 class DocumentService:
+    def __init__(
+        self,
+        max_pdf_pages: Optional[int] = None,
+        docx_template: Optional[Path] = None,
+        fonts_dir: Optional[Path] = None,
+        max_input_pages: Optional[int] = None,
+    ) -> None:
+        self.max_pdf_pages = max_pdf_pages
+        self.max_input_pages = max_input_pages
+        self.docx_template = docx_template
+        self.fonts_dir = fonts_dir
+
+    def fonts(self) -> FontSet:
+        from bot.engines.fonts import register_fonts
+
+        return register_fonts(str(self.fonts_dir) if self.fonts_dir else None)
+
+    def warm_up(self) -> None:
+        load_engines()
+        self.fonts()
+
     def text_to_document(
         self,
         title: str,
@@ -27,32 +103,321 @@ class DocumentService:
         font_size: int,
         output_format: str,
     ) -> GeneratedFile:
-        content, mime_type = build_text_document(title, body, alignment, style, font_size, output_format)
+        from bot.engines.text_engine import build_text_document
+
+        content, mime_type = build_text_document(
+            title,
+            body,
+            alignment,
+            style,
+            font_size,
+            output_format,
+            template=self.docx_template,
+            fonts=self.fonts() if output_format == "pdf" else None,
+        )
         filename = f"document.{output_format}"
         return GeneratedFile(content=content, filename=filename, mime_type=mime_type)
 
-    def images_to_pdf(self, images: Iterable[bytes], title: Optional[str]) -> GeneratedFile:
-        content = images_to_pdf(images, title=title)
+    def images_to_pdf(
+        self,
+        images: Iterable[InputSource],
+        title: Optional[str],
+        quality: ImageQuality = ImageQuality.SCREEN,
+    ) -> GeneratedFile:
+        from bot.engines.image_engine import images_to_pdf
+
+        content = images_to_pdf(images, title=title, fonts=self.fonts(), quality=ImageQuality(quality))
         return GeneratedFile(content=content, filename="images.pdf", mime_type="application/pdf")
 
-    def image_to_passport(self, image: bytes, as_pdf: bool) -> GeneratedFile:
+    def prepare_image(self, image: InputSource, quality: ImageQuality = ImageQuality.SCREEN) -> PreparedImage:
+        from bot.engines.image_engine import QUALITY_PRESETS, prepare_image
+
+        max_dpi, jpeg_quality = QUALITY_PRESETS[ImageQuality(quality)]
+        return prepare_image(image, max_dpi=max_dpi, quality=jpeg_quality)
+
+    def render_images(self, images: Sequence[PreparedImage], title: Optional[str]) -> GeneratedFile:
+        from bot.engines.image_engine import render_images_pdf
+
+        content = render_images_pdf(images, title=title, fonts=self.fonts())
+        return GeneratedFile(content=content, filename="images.pdf", mime_type="application/pdf")
+
+    def image_to_passport(self, image: InputSource, as_pdf: bool) -> GeneratedFile:
+        from bot.engines.image_engine import image_to_passport
+
         content = image_to_passport(image, as_pdf=as_pdf)
         extension = "pdf" if as_pdf else "jpg"
         mime_type = "application/pdf" if as_pdf else "image/jpeg"
         return GeneratedFile(content=content, filename=f"passport.{extension}", mime_type=mime_type)
 
-    def merge_pdfs(self, pdf_files: Iterable[bytes]) -> GeneratedFile:
-        content = merge_pdfs(pdf_files)
-        return GeneratedFile(content=content, filename="merged.pdf", mime_type="application/pdf")
+    def passport_batch(self, images: Iterable[InputSource], as_zip: bool) -> GeneratedFile:
+        from bot.engines.image_engine import passport_batch
 
-    def docx_to_pdf(self, docx_bytes: bytes, title: Optional[str]) -> GeneratedFile:
-        content = docx_to_pdf(docx_bytes, title=title)
-        return GeneratedFile(content=content, filename="document.pdf", mime_type="application/pdf")
+        return self._passport_file(passport_batch(images, as_zip=as_zip), as_zip)
+
+    def prepare_passport(self, image: InputSource) -> PreparedImage:
+        from bot.engines.image_engine import prepare_passport
+
+        return prepare_passport(image)
+
+    def render_passports(self, images: Sequence[PreparedImage], as_zip: bool) -> GeneratedFile:
+        from bot.engines.image_engine import render_passport_sheet, render_passport_zip
+
+        content = render_passport_zip(images) if as_zip else render_passport_sheet(images)
+        return self._passport_file(content, as_zip)
+
+    @staticmethod
+    def _passport_file(content: bytes, as_zip: bool) -> GeneratedFile:
+        if as_zip:
+            return GeneratedFile(content=content, filename="passports.zip", mime_type="application/zip")
+        return GeneratedFile(content=content, filename="passport_sheet.pdf", mime_type="application/pdf")
+
+    def inspect_pdf(self, pdf_file: InputSource) -> PdfInfo:
+        from bot.engines.pdf_engine import inspect_pdf
+
+        return inspect_pdf(pdf_file)
 
-    def pdf_to_docx(self, pdf_bytes: bytes) -> GeneratedFile:
-        content = pdf_to_docx(pdf_bytes)
+    def extract_text_chunk(self, pdf_file: InputSource, start: int, stop: int) -> List[str]:
+        from bot.engines.pdf_engine import extract_text_chunk
+
+        return extract_text_chunk(pdf_file, start, stop)
+
+    def merge_pdfs(self, pdf_files: Iterable[InputSource]) -> GeneratedFile:
+        from bot.engines.pdf_engine import merge_pdfs
+
+        output = create_temp_file(".pdf")
+        try:
+            merge_pdfs(pdf_files, output.path)
+        except BaseException:
+            output.cleanup()
+            raise
+        return GeneratedFile(content=b"", filename="merged.pdf", mime_type="application/pdf", path=output.path)
+
+    def compress_pdf(self, pdf_file: InputSource) -> GeneratedFile:
+        from bot.engines.pdf_engine import compress_pdf
+
+        original_size = len(pdf_file) if isinstance(pdf_file, bytes) else os.path.getsize(pdf_file)
+        output = create_temp_file(".pdf")
+        try:
+            compress_pdf(pdf_file, output.path)
+            if output.path.stat().st_size >= original_size:
+                # Nothing to gain: hand back the original rather than a bigger copy.
+                if isinstance(pdf_file, bytes):
+                    output.path.write_bytes(pdf_file)
+                else:
+                    shutil.copyfile(pdf_file, output.path)
+        except BaseException:
+            output.cleanup()
+            raise
         return GeneratedFile(
-            content=content,
-            filename="document.docx",
-            mime_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+            content=b"",
+            filename="compressed.pdf",
+            mime_type="application/pdf",
+            path=output.path,
+            original_size=original_size,
+        )
+
+    def docx_to_pdf(self, docx_file: InputSource, title: Optional[str]) -> GeneratedFile:
+        from bot.engines.docx_engine import docx_to_pdf
+
+        content = docx_to_pdf(docx_file, title=title, fonts=self.fonts())
+        return GeneratedFile(content=content, filename="document.pdf", mime_type="application/pdf")
+
+    def pdf_to_docx(self, pdf_file: InputSource, page_range: Optional[PageRange] = None) -> GeneratedFile:
+        from bot.engines.pdf_engine import pdf_to_docx
+
+        content = pdf_to_docx(
+            pdf_file,
+            page_range=page_range,
+            max_pages=self.max_pdf_pages,
+            template=self.docx_template,
         )
+        return GeneratedFile(content=content, filename="document.docx", mime_type=DOCX_MIME_TYPE)
+
+    def pages_to_docx(self, pages: Sequence[str]) -> GeneratedFile:
+        from bot.engines.pdf_engine import build_docx
+
+        content = build_docx(pages, template=self.docx_template)
+        return GeneratedFile(content=content, filename="document.docx", mime_type=DOCX_MIME_TYPE)
+
+
+T = TypeVar("T")
+Method = Callable[..., Awaitable[T]]
+
+
+# Operation label for the worker calls a public method makes; gathered
+# subtasks inherit it with the context.
+_operation: ContextVar[Optional[str]] = ContextVar("operation", default=None)
+
+
+def instrumented(operation: str) -> Callable[[Method[T]], Method[T]]:
+    def decorator(method: Method[T]) -> Method[T]:
+        @wraps(method)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            token = _operation.set(operation)
+            try:
+                result = await method(*args, **kwargs)
+            finally:
+                _operation.reset(token)
+            if isinstance(result, GeneratedFile):
+                size = result.path.stat().st_size if result.path is not None else len(result.content)
+                OUTPUT_BYTES.observe(size, operation=operation)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+class AsyncDocumentService:
+    def __init__(
+        self,
+        service: DocumentService,
+        processes: int,
+        max_concurrent_jobs: int,
+        warm_up: bool = False,
+        default_deadline: Optional[float] = DEFAULT_DEADLINE,
+        deadlines: Optional[Mapping[str, Optional[float]]] = None,
+    ) -> None:
+        self._service = service
+        self._pool = WorkerPool(processes, initializer=service.warm_up if warm_up else None)
+        self._processes = processes
+        self._semaphore = asyncio.Semaphore(max_concurrent_jobs)
+        self._default_deadline = default_deadline
+        self._deadlines = {**DEADLINES, **(deadlines or {})}
+
+    async def _submit(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        method = func
+        while isinstance(method, partial):
+            method = method.func
+        name = method.__name__
+        operation = _operation.get() or name
+        if operation in self._deadlines:
+            deadline = self._deadlines[operation]
+        else:
+            deadline = self._deadlines.get(name, self._default_deadline)
+        # "queue" is the wait for an idle worker, "engine" the worker call
+        # alone, so a saturated pool does not read as slow conversions.
+        with track_phase(operation, "queue"):
+            worker = await self._pool.acquire()
+        try:
+            with track_phase(operation, "engine"):
+                return await self._pool.call(worker, func, args, kwargs, deadline=deadline)
+        except ConversionTimeoutError:
+            logging.warning("%s (%s) exceeded its %ss deadline; worker killed", operation, name, deadline)
+            TIMEOUTS.inc(operation=operation, method=name)
+            raise
+        finally:
+            self._pool.release(worker)
+
+    async def _run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        async with self._semaphore:
+            return await self._submit(func, *args, **kwargs)
+
+    async def _prepare_and_render(
+        self,
+        images: Iterable[InputSource],
+        prepare: Callable[[InputSource], PreparedImage],
+        render: Callable[[List[PreparedImage]], GeneratedFile],
+    ) -> GeneratedFile:
+        # Decode every image in parallel across the pool, then lay them out in one job.
+        async with self._semaphore:
+            results = await asyncio.gather(
+                *(self._submit(prepare, source) for source in images),
+                return_exceptions=True,
+            )
+            prepared = [result for result in results if isinstance(result, PreparedImage)]
+            try:
+                errors = [result for result in results if isinstance(result, BaseException)]
+                if errors:
+                    raise errors[0]
+                return await self._submit(render, prepared)
+            finally:
+                cleanup_files(TempFile(path=Path(image.path)) for image in prepared if image.temporary)
+
+    @instrumented("text_to_document")
+    async def text_to_document(
+        self,
+        title: str,
+        body: str,
+        alignment: TextAlignment,
+        style: TextStyle,
+        font_size: int,
+        output_format: str,
+    ) -> GeneratedFile:
+        return await self._run(
+            self._service.text_to_document,
+            title=title,
+            body=body,
+            alignment=alignment,
+            style=style,
+            font_size=font_size,
+            output_format=output_format,
+        )
+
+    @instrumented("images_to_pdf")
+    async def images_to_pdf(
+        self,
+        images: Iterable[InputSource],
+        title: Optional[str],
+        quality: ImageQuality = ImageQuality.SCREEN,
+    ) -> GeneratedFile:
+        prepare = partial(self._service.prepare_image, quality=quality)
+        return await self._prepare_and_render(images, prepare, partial(self._service.render_images, title=title))
+
+    @instrumented("image_to_passport")
+    async def image_to_passport(self, image: InputSource, as_pdf: bool) -> GeneratedFile:
+        return await self._run(self._service.image_to_passport, image, as_pdf=as_pdf)
+
+    @instrumented("passport_batch")
+    async def passport_batch(self, images: Iterable[InputSource], as_zip: bool) -> GeneratedFile:
+        render = partial(self._service.render_passports, as_zip=as_zip)
+        return await self._prepare_and_render(images, self._service.prepare_passport, render)
+
+    @instrumented("inspect_pdf")
+    async def inspect_pdf(self, pdf_file: InputSource) -> PdfInfo:
+        return await self._run(self._service.inspect_pdf, pdf_file)
+
+    @instrumented("merge_pdfs")
+    async def merge_pdfs(self, pdf_files: Iterable[InputSource]) -> GeneratedFile:
+        pdf_list: List[InputSource] = list(pdf_files)
+        return await self._run(self._service.merge_pdfs, pdf_list)
+
+    @instrumented("compress_pdf")
+    async def compress_pdf(self, pdf_file: InputSource) -> GeneratedFile:
+        return await self._run(self._service.compress_pdf, pdf_file)
+
+    @instrumented("docx_to_pdf")
+    async def docx_to_pdf(self, docx_file: InputSource, title: Optional[str]) -> GeneratedFile:
+        return await self._run(self._service.docx_to_pdf, docx_file, title=title)
+
+    @instrumented("pdf_to_docx")
+    async def pdf_to_docx(self, pdf_file: InputSource, page_range: Optional[PageRange] = None) -> GeneratedFile:
+        async with self._semaphore:
+            info = await self._submit(self._service.inspect_pdf, pdf_file)
+            # Every text chunk reopens the file and walks its whole page tree, so
+            # the document itself must fit the budget, not just the chosen range.
+            limit = self._service.max_input_pages
+            if limit is not None and info.page_count > limit:
+                raise PageLimitError(info.page_count, limit)
+            pages = resolve_page_range(info.page_count, page_range, self._service.max_pdf_pages)
+            chunk_size = max(1, min(PAGE_CHUNK_SIZE, math.ceil(len(pages) / self._processes)))
+            chunks = await asyncio.gather(
+                *(
+                    self._submit(
+                        self._service.extract_text_chunk,
+                        pdf_file,
+                        start,
+                        min(start + chunk_size, pages.stop),
+                    )
+                    for start in range(pages.start, pages.stop, chunk_size)
+                )
+            )
+            return await self._submit(self._service.pages_to_docx, [text for chunk in chunks for text in chunk])
+
+    async def warm_up(self) -> None:
+        # The pool starts workers lazily, one per submitted task, so submitting one
+        # task per process brings them all up and runs the warm-up initializer.
+        await asyncio.gather(*(self._submit(self._service.warm_up) for _ in range(self._processes)))
+
+    def shutdown(self) -> None:
+        self._pool.shutdown()
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    operation TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    inputs TEXT NOT NULL,
+    chat_id INTEGER NOT NULL,
+    language TEXT NOT NULL,
+    cache_key TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at REAL NOT NULL,
+    locked_until REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, id);
+"""
+
+
+@dataclass
+class Job:
+    id: int
+    operation: str
+    payload: Dict[str, Any]
+    inputs: List[str]
+    chat_id: int
+    language: str
+    cache_key: Optional[str]
+    attempts: int
+
+
+class JobQueue:
+    def __init__(self, path: Path, lease_seconds: int = 900, max_attempts: int = 3) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(path, isolation_level=None, timeout=30)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(SCHEMA)
+        self._lease_seconds = lease_seconds
+        self._max_attempts = max_attempts
+
+    def submit(
+        self,
+        operation: str,
+        payload: Dict[str, Any],
+        inputs: List[str],
+        chat_id: int,
+        language: str,
+        cache_key: Optional[str] = None,
+    ) -> int:
+        cursor = self._connection.execute(
+            "INSERT INTO jobs (operation, payload, inputs, chat_id, language, cache_key, created_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (operation, json.dumps(payload), json.dumps(inputs), chat_id, language, cache_key, time.time()),
+        )
+        return int(cursor.lastrowid)
+
+    def claim(self) -> Optional[Job]:
+        now = time.time()
+        self._connection.execute("BEGIN IMMEDIATE")
+        try:
+            self._connection.execute(
+                "UPDATE jobs SET status = 'failed', error = 'lease expired', locked_until = NULL"
+                " WHERE status = 'running' AND locked_until < ? AND attempts >= ?",
+                (now, self._max_attempts),
+            )
+            row = self._connection.execute(
+                "SELECT id, operation, payload, inputs, chat_id, language, cache_key, attempts FROM jobs"
+                " WHERE (status = 'pending' OR (status = 'running' AND locked_until < ?)) AND attempts < ?"
+                " ORDER BY id LIMIT 1",
+                (now, self._max_attempts),
+            ).fetchone()
+            if row is None:
+                self._connection.execute("COMMIT")
+                return None
+            self._connection.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, locked_until = ? WHERE id = ?",
+                (now + self._lease_seconds, row[0]),
+            )
+            self._connection.execute("COMMIT")
+        except BaseException:
+            self._connection.execute("ROLLBACK")
+            raise
+        return Job(
+            id=row[0],
+            operation=row[1],
+            payload=json.loads(row[2]),
+            inputs=json.loads(row[3]),
+            chat_id=row[4],
+            language=row[5],
+            cache_key=row[6],
+            attempts=row[7] + 1,
+        )
+
+    def complete(self, job_id: int) -> None:
+        self._connection.execute("UPDATE jobs SET status = 'done', locked_until = NULL WHERE id = ?", (job_id,))
+
+    def fail(self, job_id: int, error: str) -> None:
+        self._connection.execute(
+            "UPDATE jobs SET status = 'failed', error = ?, locked_until = NULL WHERE id = ?",
+            (error, job_id),
+        )
+
+    def close(self) -> None:
+        self._connection.close()
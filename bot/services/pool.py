@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.connection import Connection
+from multiprocessing.context import BaseContext
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from bot.models.documents import ConversionTimeoutError
+
+Task = Tuple[Callable[..., Any], Sequence[Any], Dict[str, Any]]
+
+
+class WorkerCrashedError(RuntimeError):
+    pass
+
+
+def _serve(connection: Connection, initializer: Optional[Callable[[], None]]) -> None:
+    if initializer is not None:
+        initializer()
+    while True:
+        try:
+            task: Optional[Task] = connection.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+        func, args, kwargs = task
+        try:
+            result: Tuple[bool, Any] = (True, func(*args, **kwargs))
+        except Exception as error:
+            result = (False, error)
+        try:
+            connection.send(result)
+        except Exception as error:
+            # The result or exception could not be pickled; nothing was written yet.
+            connection.send((False, RuntimeError(repr(error))))
+
+
+class _Worker:
+    def __init__(self, context: BaseContext, initializer: Optional[Callable[[], None]]) -> None:
+        self._context = context
+        self._initializer = initializer
+        self.process: Optional[multiprocessing.process.BaseProcess] = None
+        self.connection: Optional[Connection] = None
+
+    def start(self) -> Connection:
+        if self.process is not None and not self.process.is_alive():
+            # Died while idle (OOM killer, signal): replace it before use.
+            self.kill()
+        if self.process is None or self.connection is None:
+            parent, child = self._context.Pipe()
+            self.process = self._context.Process(target=_serve, args=(child, self._initializer), daemon=True)
+            self.process.start()
+            # Drop our copy of the child end so a dead worker shows up as EOF.
+            child.close()
+            self.connection = parent
+        return self.connection
+
+    def kill(self) -> None:
+        # The connection is left open: a receiver thread may still be blocked on
+        # it and gets EOF now. Closing it here could hand its descriptor number
+        # to the next worker's pipe while that thread is still reading.
+        if self.process is not None:
+            self.process.kill()
+            self.process.join()
+        self.process = None
+        self.connection = None
+
+
+class WorkerPool:
+    # ProcessPoolExecutor cannot stop one running task: its only remedy for a
+    # stuck call is tearing down the whole pool. Here every worker owns a pipe,
+    # so a call past its deadline kills just that worker and a fresh one takes
+    # its slot on the next submission.
+    def __init__(self, processes: int, initializer: Optional[Callable[[], None]] = None) -> None:
+        context = multiprocessing.get_context()
+        self._workers: List[_Worker] = [_Worker(context, initializer) for _ in range(processes)]
+        self._idle: asyncio.Queue[_Worker] = asyncio.Queue()
+        for worker in self._workers:
+            self._idle.put_nowait(worker)
+        # One blocking recv() per busy worker, plus slack for threads of killed
+        # workers that are still returning.
+        self._receivers = ThreadPoolExecutor(max_workers=processes * 2, thread_name_prefix="pool-receiver")
+
+    async def run(
+        self,
+        func: Callable[..., Any],
+        args: Sequence[Any] = (),
+        kwargs: Optional[Dict[str, Any]] = None,
+        deadline: Optional[float] = None,
+    ) -> Any:
+        worker = await self.acquire()
+        try:
+            return await self.call(worker, func, args, kwargs, deadline)
+        finally:
+            self.release(worker)
+
+    async def acquire(self) -> _Worker:
+        return await self._idle.get()
+
+    def release(self, worker: _Worker) -> None:
+        self._idle.put_nowait(worker)
+
+    async def call(
+        self,
+        worker: _Worker,
+        func: Callable[..., Any],
+        args: Sequence[Any] = (),
+        kwargs: Optional[Dict[str, Any]] = None,
+        deadline: Optional[float] = None,
+    ) -> Any:
+        task: Task = (func, args, kwargs or {})
+        connection = worker.start()
+        try:
+            connection.send(task)
+        except (EOFError, OSError) as error:
+            # The worker went away between start() and send().
+            worker.kill()
+            raise WorkerCrashedError("Conversion worker exited unexpectedly") from error
+        receive = asyncio.get_running_loop().run_in_executor(self._receivers, connection.recv)
+        try:
+            succeeded, value = await asyncio.wait_for(receive, deadline)
+        except asyncio.TimeoutError:
+            worker.kill()
+            raise ConversionTimeoutError(deadline) from None
+        except asyncio.CancelledError:
+            # The worker is still busy with a result nobody will read.
+            worker.kill()
+            raise
+        except (EOFError, OSError) as error:
+            worker.kill()
+            raise WorkerCrashedError("Conversion worker exited unexpectedly") from error
+        if not succeeded:
+            raise value
+        return value
+
+    def shutdown(self) -> None:
+        for worker in self._workers:
+            if worker.process is not None:
+                worker.process.terminate()
+        self._receivers.shutdown(wait=False, cancel_futures=True)
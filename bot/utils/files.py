@@ -2,9 +2,20 @@ from __future__ import annotations
 
 import os
 import tempfile
+import time
+from contextlib import contextmanager
 from dataclasses import dataclass
+from io import BytesIO
 from pathlib import Path
-from typing import Iterable
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, Union
+
+InputSource = Union[bytes, str, Path]
+
+SESSION_FILE_KEYS = ("images", "pdfs")
+
+# Every temp file lives here, so files left behind by abandoned sessions or
+# killed workers can be found and removed by age.
+TEMP_DIR = Path(tempfile.gettempdir()) / "konvertchi-files"
 
 
 @dataclass
@@ -19,7 +30,8 @@ class TempFile:
 
 
 def create_temp_file(suffix: str) -> TempFile:
-    fd, path = tempfile.mkstemp(suffix=suffix)
+    TEMP_DIR.mkdir(parents=True, exist_ok=True)
+    fd, path = tempfile.mkstemp(suffix=suffix, dir=TEMP_DIR)
     os.close(fd)
     return TempFile(path=Path(path))
 
@@ -27,3 +39,32 @@ def create_temp_file(suffix: str) -> TempFile:
 def cleanup_files(files: Iterable[TempFile]) -> None:
     for temp_file in files:
         temp_file.cleanup()
+
+
+def cleanup_session_files(data: Dict[str, Any]) -> None:
+    for key in SESSION_FILE_KEYS:
+        cleanup_files(TempFile(path=Path(entry["path"])) for entry in data.get(key, []))
+
+
+def remove_stale_files(max_age: float, directory: Path = TEMP_DIR) -> int:
+    cutoff = time.time() - max_age
+    removed = 0
+    if not directory.is_dir():
+        return removed
+    for path in directory.iterdir():
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except FileNotFoundError:
+            continue
+    return removed
+
+
+@contextmanager
+def open_source(source: InputSource) -> Iterator[BinaryIO]:
+    if isinstance(source, bytes):
+        yield BytesIO(source)
+        return
+    with open(source, "rb") as handle:
+        yield handle
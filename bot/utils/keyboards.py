@@ -21,9 +21,11 @@ def menu_keyboard(language: str) -> InlineKeyboardMarkup:
             [InlineKeyboardButton(text=t(language, "menu_text_to_pdf"), callback_data="action:text_pdf")],
             [InlineKeyboardButton(text=t(language, "menu_image_to_pdf"), callback_data="action:image_pdf")],
             [InlineKeyboardButton(text=t(language, "menu_image_to_passport"), callback_data="action:image_passport")],
+            [InlineKeyboardButton(text=t(language, "menu_passport_batch"), callback_data="action:passport_batch")],
             [InlineKeyboardButton(text=t(language, "menu_pdf_merge"), callback_data="action:pdf_merge")],
             [InlineKeyboardButton(text=t(language, "menu_docx_to_pdf"), callback_data="action:docx_pdf")],
             [InlineKeyboardButton(text=t(language, "menu_pdf_to_docx"), callback_data="action:pdf_docx")],
+            [InlineKeyboardButton(text=t(language, "menu_pdf_compress"), callback_data="action:pdf_compress")],
         ]
     )
 
@@ -60,6 +62,31 @@ def size_keyboard(language: str) -> InlineKeyboardMarkup:
     )
 
 
+def quality_keyboard(language: str) -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup(
+        inline_keyboard=[
+            [InlineKeyboardButton(text=t(language, "button_quality_screen"), callback_data="quality:screen")],
+            [InlineKeyboardButton(text=t(language, "button_quality_print"), callback_data="quality:print")],
+            [InlineKeyboardButton(text=t(language, "button_quality_original"), callback_data="quality:original")],
+        ]
+    )
+
+
+def passport_output_keyboard(language: str) -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup(
+        inline_keyboard=[
+            [InlineKeyboardButton(text=t(language, "button_passport_sheet"), callback_data="passport:sheet")],
+            [InlineKeyboardButton(text=t(language, "button_passport_zip"), callback_data="passport:zip")],
+        ]
+    )
+
+
+def page_range_keyboard(language: str) -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup(
+        inline_keyboard=[[InlineKeyboardButton(text=t(language, "button_all_pages"), callback_data="pages:all")]]
+    )
+
+
 def done_keyboard(language: str) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(
         inline_keyboard=[[InlineKeyboardButton(text=t(language, "button_done"), callback_data="done")]]
@@ -1,15 +1,115 @@
 from __future__ import annotations
 
-from typing import Optional
+import asyncio
+from pathlib import Path
+from typing import Iterable, List, Optional
 
 from aiogram import Bot
-from aiogram.types import Document, PhotoSize
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import PRODUCTION, SimpleFilesPathWrapper, TelegramAPIServer
+from aiogram.types import BufferedInputFile, Document, FSInputFile, Message, PhotoSize
 
+from bot.core.cache import ConversionCache
+from bot.core.config import BotConfig
+from bot.core.metrics import INPUT_BYTES, track_phase
+from bot.i18n import t
+from bot.services.document_service import GeneratedFile
+from bot.utils.files import TempFile, cleanup_files, create_temp_file
+from bot.utils.validators import HEADER_BYTES, ContentRules, InvalidFileError, check_header
 
-async def download_document(bot: Bot, document: Document) -> bytes:
-    file = await bot.get_file(document.file_id)
-    downloaded = await bot.download_file(file.file_path)
-    return downloaded.read() if hasattr(downloaded, "read") else downloaded
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+
+def create_bot(config: BotConfig) -> Bot:
+    api = PRODUCTION
+    if config.api_url:
+        options = {}
+        if config.api_server_dir is not None and config.api_local_dir is not None:
+            # The server runs elsewhere (e.g. a container) with its data directory mounted here.
+            options["wrap_local_file"] = SimpleFilesPathWrapper(config.api_server_dir, config.api_local_dir)
+        api = TelegramAPIServer.from_base(config.api_url, is_local=config.api_local, **options)
+    return Bot(token=config.token, session=AiohttpSession(api=api, limit=config.http_connections))
+
+
+def _check_local_file(path: Path, rules: Optional[ContentRules]) -> None:
+    if rules is None:
+        return
+    if rules.max_bytes is not None and path.stat().st_size > rules.max_bytes:
+        raise InvalidFileError(f"File is larger than {rules.max_bytes} bytes")
+    with open(path, "rb") as handle:
+        check_header(handle.read(HEADER_BYTES), rules)
+
+
+async def _stream_file(bot: Bot, file_path: str, destination: Path, rules: Optional[ContentRules]) -> None:
+    # Validate the header as soon as it has arrived, so a fake or oversized
+    # file is rejected without downloading the rest of it.
+    stream = bot.session.stream_content(
+        url=bot.session.api.file_url(bot.token, file_path),
+        chunk_size=DOWNLOAD_CHUNK_SIZE,
+    )
+    head = b""
+    size = 0
+    try:
+        with open(destination, "wb") as output:
+            async for chunk in stream:
+                size += len(chunk)
+                if rules is not None:
+                    if rules.max_bytes is not None and size > rules.max_bytes:
+                        raise InvalidFileError(f"File is larger than {rules.max_bytes} bytes")
+                    if len(head) < HEADER_BYTES:
+                        head += chunk
+                        if len(head) >= HEADER_BYTES:
+                            check_header(head, rules)
+                output.write(chunk)
+        if rules is not None and len(head) < HEADER_BYTES:
+            check_header(head, rules)
+    finally:
+        await stream.aclose()
+
+
+async def download_file(
+    bot: Bot,
+    file_id: str,
+    file_unique_id: str,
+    suffix: str,
+    cache: Optional[ConversionCache],
+    operation: str = "unknown",
+    rules: Optional[ContentRules] = None,
+) -> TempFile:
+    temp_file = create_temp_file(suffix)
+    key = ConversionCache.make_key(file_unique_id, "download")
+    try:
+        with track_phase(operation, "download"):
+            if bot.session.api.is_local:
+                # A local Bot API server has already stored the file on disk; link to it
+                # instead of streaming a copy. Cleaning up the temp file only drops the link.
+                file = await bot.get_file(file_id)
+                temp_file.path.unlink()
+                temp_file.path.symlink_to(bot.session.api.wrap_local_file.to_local(file.file_path))
+                _check_local_file(temp_file.path, rules)
+            elif cache is not None and cache.copy_to(key, temp_file.path):
+                _check_local_file(temp_file.path, rules)
+            else:
+                file = await bot.get_file(file_id)
+                await _stream_file(bot, file.file_path, temp_file.path, rules)
+                if cache is not None:
+                    cache.put_file(key, temp_file.path)
+    except BaseException:
+        temp_file.cleanup()
+        raise
+    INPUT_BYTES.observe(temp_file.path.stat().st_size, operation=operation)
+    return temp_file
+
+
+async def download_document(
+    bot: Bot,
+    document: Document,
+    cache: Optional[ConversionCache] = None,
+    operation: str = "unknown",
+    rules: Optional[ContentRules] = None,
+) -> TempFile:
+    suffix = Path(document.file_name or "").suffix
+    return await download_file(bot, document.file_id, document.file_unique_id, suffix, cache, operation, rules)
 
 
 def extract_photo(message_photo: list[PhotoSize]) -> Optional[PhotoSize]:
@@ -18,7 +118,76 @@ def extract_photo(message_photo: list[PhotoSize]) -> Optional[PhotoSize]:
     return max(message_photo, key=lambda p: p.file_size or 0)
 
 
-async def download_photo(bot: Bot, photo: PhotoSize) -> bytes:
-    file = await bot.get_file(photo.file_id)
-    downloaded = await bot.download_file(file.file_path)
-    return downloaded.read() if hasattr(downloaded, "read") else downloaded
+async def download_photo(
+    bot: Bot,
+    photo: PhotoSize,
+    cache: Optional[ConversionCache] = None,
+    operation: str = "unknown",
+    rules: Optional[ContentRules] = None,
+) -> TempFile:
+    return await download_file(bot, photo.file_id, photo.file_unique_id, ".jpg", cache, operation, rules)
+
+
+async def download_photos(
+    bot: Bot,
+    photos: Iterable[PhotoSize],
+    cache: Optional[ConversionCache] = None,
+    operation: str = "unknown",
+    concurrency: int = 4,
+    rules: Optional[ContentRules] = None,
+) -> List[TempFile]:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def download(photo: PhotoSize) -> TempFile:
+        async with semaphore:
+            return await download_photo(bot, photo, cache, operation, rules)
+
+    results = await asyncio.gather(*(download(photo) for photo in photos), return_exceptions=True)
+    temp_files = [result for result in results if isinstance(result, TempFile)]
+    errors = [result for result in results if isinstance(result, BaseException)]
+    if errors:
+        cleanup_files(temp_files)
+        raise errors[0]
+    return temp_files
+
+
+def _megabytes(size: int) -> str:
+    return f"{size / (1024 * 1024):.1f}"
+
+
+def result_caption(language: str, document: GeneratedFile) -> str:
+    if document.original_size is None or document.path is None:
+        return t(language, "success")
+    size = document.path.stat().st_size
+    saved = max(0, document.original_size - size) * 100 // max(1, document.original_size)
+    return t(
+        language,
+        "compressed",
+        before=_megabytes(document.original_size),
+        after=_megabytes(size),
+        saved=str(saved),
+    )
+
+
+async def send_generated(
+    bot: Bot,
+    chat_id: int,
+    document: GeneratedFile,
+    caption: str,
+    cache: Optional[ConversionCache] = None,
+    key: Optional[str] = None,
+    operation: str = "unknown",
+) -> Message:
+    if document.path is not None:
+        input_file = FSInputFile(document.path, filename=document.filename)
+    else:
+        input_file = BufferedInputFile(document.content, filename=document.filename)
+    try:
+        with track_phase(operation, "upload"):
+            sent = await bot.send_document(chat_id, input_file, caption=caption)
+    finally:
+        if document.path is not None:
+            TempFile(path=document.path).cleanup()
+    if cache is not None and key is not None and sent.document:
+        cache.set_file_id(key, sent.document.file_id)
+    return sent
@@ -1,7 +1,38 @@
 from __future__ import annotations
 
+import re
+import struct
 from dataclasses import dataclass
-from typing import Iterable
+from typing import FrozenSet, Iterable, Optional, Tuple
+
+from bot.models.documents import PageLimitError
+
+PAGE_RANGE_PATTERN = re.compile(r"^\s*(\d+)\s*(?:[-–—]\s*(\d+))?\s*$")
+LINEARIZED_PAGES_PATTERN = re.compile(rb"/Linearized\b.*?/N\s+(\d+)", re.DOTALL)
+
+# Enough to hold the signature, the PNG header and the JPEG segments before
+# the frame header in nearly every camera file.
+HEADER_BYTES = 64 * 1024
+PDF_HEADER_WINDOW = 1024
+MAGIC_NUMBERS = (
+    (b"\xff\xd8\xff", "jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"PK\x03\x04", "zip"),
+)
+JPEG_FRAME_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+JPEG_STANDALONE_MARKERS = frozenset(range(0xD0, 0xD9)) | {0x01}
+
+
+class InvalidFileError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class ContentRules:
+    formats: FrozenSet[str]
+    max_bytes: Optional[int] = None
+    max_pixels: Optional[int] = None
+    max_pages: Optional[int] = None
 
 
 @dataclass(frozen=True)
@@ -18,3 +49,75 @@ def is_mime_valid(mime_type: str | None, allowed_mime_types: Iterable[str]) -> b
     if not mime_type:
         return False
     return mime_type in allowed_mime_types
+
+
+def sniff_format(head: bytes) -> Optional[str]:
+    for magic, name in MAGIC_NUMBERS:
+        if head.startswith(magic):
+            return name
+    # PDF readers accept the signature anywhere in the first kilobyte.
+    if b"%PDF-" in head[:PDF_HEADER_WINDOW]:
+        return "pdf"
+    if head and b"\x00" not in head:
+        return "text"
+    return None
+
+
+def _jpeg_size(head: bytes) -> Optional[Tuple[int, int]]:
+    index = 2
+    while index + 9 <= len(head):
+        if head[index] != 0xFF:
+            return None
+        marker = head[index + 1]
+        if marker == 0xFF:
+            index += 1
+        elif marker in JPEG_FRAME_MARKERS:
+            height, width = struct.unpack(">HH", head[index + 5 : index + 9])
+            return width, height
+        elif marker in JPEG_STANDALONE_MARKERS:
+            index += 2
+        else:
+            index += 2 + struct.unpack(">H", head[index + 2 : index + 4])[0]
+    return None
+
+
+def image_size(head: bytes) -> Optional[Tuple[int, int]]:
+    format_name = sniff_format(head)
+    if format_name == "png" and head[12:16] == b"IHDR":
+        width, height = struct.unpack(">II", head[16:24])
+        return width, height
+    if format_name == "jpeg":
+        return _jpeg_size(head)
+    return None
+
+
+def pdf_page_count(head: bytes) -> Optional[int]:
+    # Only linearized files state their page count up front; others are
+    # checked once the engine opens them.
+    match = LINEARIZED_PAGES_PATTERN.search(head[:PDF_HEADER_WINDOW])
+    return int(match.group(1)) if match else None
+
+
+def check_header(head: bytes, rules: ContentRules) -> None:
+    format_name = sniff_format(head)
+    if format_name not in rules.formats:
+        raise InvalidFileError(f"Unexpected file format: {format_name}")
+    if rules.max_pixels is not None:
+        size = image_size(head)
+        if size is not None and size[0] * size[1] > rules.max_pixels:
+            raise InvalidFileError(f"Image is too large: {size[0]}x{size[1]}")
+    if rules.max_pages is not None and format_name == "pdf":
+        page_count = pdf_page_count(head)
+        if page_count is not None and page_count > rules.max_pages:
+            raise PageLimitError(page_count, rules.max_pages)
+
+
+def parse_page_range(text: str | None) -> Optional[Tuple[int, int]]:
+    match = PAGE_RANGE_PATTERN.match(text or "")
+    if not match:
+        return None
+    start = int(match.group(1))
+    end = int(match.group(2) or start)
+    if start < 1 or end < start:
+        return None
+    return start, end
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from pathlib import Path
+from typing import Set
+
+from aiogram import Bot
+
+from bot.core.cache import ConversionCache
+from bot.core.config import load_config
+from bot.core.metrics import start_metrics_server
+from bot.i18n import t
+from bot.models.documents import ConversionTimeoutError, PageLimitError, PageRangeError
+from bot.services.document_service import AsyncDocumentService, DocumentService
+from bot.services.jobs import Job, JobQueue
+from bot.utils.files import TempFile, cleanup_files
+from bot.utils.telegram import create_bot, result_caption, send_generated
+
+
+def _error_message(language: str, error: Exception) -> str:
+    if isinstance(error, ConversionTimeoutError):
+        return t(language, "timeout")
+    if isinstance(error, PageLimitError):
+        return t(language, "too_many_pages", pages=str(error.page_count), limit=str(error.limit))
+    if isinstance(error, PageRangeError):
+        return t(language, "invalid_page_range")
+    if isinstance(error, ValueError):
+        return t(language, "invalid_file")
+    return t(language, "error")
+
+
+async def process_job(
+    bot: Bot,
+    queue: JobQueue,
+    service: AsyncDocumentService,
+    cache: ConversionCache,
+    job: Job,
+) -> None:
+    try:
+        document = await getattr(service, job.operation)(**job.payload)
+        await send_generated(
+            bot,
+            job.chat_id,
+            document,
+            result_caption(job.language, document),
+            cache,
+            job.cache_key,
+            job.operation,
+        )
+    except Exception as error:
+        logging.exception("Job %s (%s) failed", job.id, job.operation)
+        queue.fail(job.id, repr(error))
+        await bot.send_message(job.chat_id, _error_message(job.language, error))
+    else:
+        queue.complete(job.id)
+    finally:
+        cleanup_files(TempFile(path=Path(path)) for path in job.inputs)
+
+
+async def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    config = load_config()
+    if config.queue.path is None:
+        raise RuntimeError("JOB_QUEUE_PATH is not set")
+    bot = create_bot(config.bot)
+    queue = JobQueue(config.queue.path)
+    service = AsyncDocumentService(
+        DocumentService(
+            max_pdf_pages=config.bot.max_pdf_pages,
+            docx_template=config.bot.docx_template,
+            fonts_dir=config.bot.fonts_dir,
+            max_input_pages=config.bot.max_input_pages,
+        ),
+        processes=config.workers.processes,
+        max_concurrent_jobs=config.workers.max_concurrent_jobs,
+        warm_up=config.workers.warm_up,
+        default_deadline=config.workers.job_timeout,
+        deadlines=config.workers.job_timeouts,
+    )
+    cache = ConversionCache(
+        config.cache.directory,
+        max_disk_bytes=config.cache.max_disk_mb * 1024 * 1024,
+        max_memory_bytes=config.cache.max_memory_mb * 1024 * 1024,
+    )
+    if config.metrics.port is not None:
+        await start_metrics_server(config.metrics.host, config.metrics.port)
+    if config.workers.warm_up:
+        await service.warm_up()
+    slots = asyncio.Semaphore(config.workers.max_concurrent_jobs)
+    tasks: Set[asyncio.Task[None]] = set()
+
+    try:
+        while True:
+            await slots.acquire()
+            job = queue.claim()
+            if job is None:
+                slots.release()
+                await asyncio.sleep(config.queue.poll_interval)
+                continue
+            task = asyncio.create_task(process_job(bot, queue, service, cache, job))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            task.add_done_callback(lambda _: slots.release())
+    finally:
+        service.shutdown()
+        queue.close()
+        await bot.session.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
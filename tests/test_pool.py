@@ -0,0 +1,67 @@
+import asyncio
+import os
+import signal
+import time
+
+import pytest
+
+from bot.models.documents import ConversionTimeoutError
+from bot.services.pool import WorkerCrashedError, WorkerPool
+
+
+def _pid() -> int:
+    return os.getpid()
+
+
+def _sleep(seconds: float) -> int:
+    time.sleep(seconds)
+    return os.getpid()
+
+
+def _crash() -> None:
+    os._exit(1)
+
+
+def _run(coroutine_factory):
+    async def main():
+        pool = WorkerPool(1)
+        try:
+            return await coroutine_factory(pool)
+        finally:
+            pool.shutdown()
+
+    return asyncio.run(main())
+
+
+def test_timeout_kills_worker_and_next_call_succeeds():
+    async def scenario(pool):
+        first = await pool.run(_pid)
+        with pytest.raises(ConversionTimeoutError):
+            await pool.run(_sleep, (10,), deadline=0.5)
+        second = await pool.run(_pid)
+        return first, second
+
+    first, second = _run(scenario)
+    assert first != second
+
+
+def test_crash_raises_and_next_call_succeeds():
+    async def scenario(pool):
+        with pytest.raises(WorkerCrashedError):
+            await pool.run(_crash)
+        return await pool.run(_pid)
+
+    assert _run(scenario) != os.getpid()
+
+
+def test_worker_dying_while_idle_is_replaced():
+    async def scenario(pool):
+        first = await pool.run(_pid)
+        os.kill(first, signal.SIGKILL)
+        while pool._workers[0].process.is_alive():
+            await asyncio.sleep(0.01)
+        second = await pool.run(_pid)
+        return first, second
+
+    first, second = _run(scenario)
+    assert first != second